@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for the data structures and algorithms in ``hw``.
+"""
@@ -0,0 +1,71 @@
+"""
+Run the benchmark suite: ``python -m benchmarks [options]``.
+
+Results can be written with ``--output`` and compared against an earlier run
+with ``--baseline``; the exit status is 1 when any case regressed by more
+than ``--threshold``.
+"""
+import argparse
+import sys
+from typing import List
+
+from benchmarks.cases import CASES, INTEGER_DISTRIBUTIONS
+from benchmarks.harness import compare, load, run_suite, save
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10**2, 10**3, 10**4, 10**5, 10**6],
+    )
+    parser.add_argument(
+        "--distributions",
+        nargs="+",
+        choices=INTEGER_DISTRIBUTIONS,
+        default=list(INTEGER_DISTRIBUTIONS),
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        default=[],
+        help="only run cases whose name contains one of these substrings",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the tracemalloc run"
+    )
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    cases = [
+        case
+        for case in CASES
+        if not args.only or any(part in case.name for part in args.only)
+    ]
+    results = run_suite(
+        cases,
+        args.sizes,
+        args.distributions,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+    )
+    if args.output:
+        save(args.output, results)
+
+    if args.baseline:
+        regressions = compare(results, load(args.baseline), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Compare hw.LRUCache and hw.LFUCache with functools.lru_cache.
+
+Run with ``python -m benchmarks.cache_bench``. Each run replays the same
+skewed (Zipf-like) key stream as read-through lookups: on a miss the value
+is computed and stored.
+"""
+import argparse
+import functools
+import random
+import time
+from typing import Callable, List
+
+import hw
+
+
+def key_stream(n: int, universe: int, seed: int = 0) -> List[int]:
+    rng = random.Random(seed)
+    return [int(universe * rng.random() ** 3) for _ in range(n)]
+
+
+def compute(key: int) -> int:
+    return key * 2 + 1
+
+
+def run_functools(keys: List[int], capacity: int) -> float:
+    cached = functools.lru_cache(maxsize=capacity)(compute)
+    start = time.perf_counter()
+    for key in keys:
+        cached(key)
+    elapsed = time.perf_counter() - start
+    info = cached.cache_info()
+    report("functools.lru_cache", info.hits, info.misses)
+    return elapsed
+
+
+def report(name: str, hits: int, misses: int) -> None:
+    print(f"{name:<22} hits={hits:<9} misses={misses:<9}", end="")
+
+
+def run_hw(
+    cache_factory: Callable[[int], hw.LRUCache], keys: List[int], capacity: int
+) -> float:
+    cache = cache_factory(capacity)
+    missing = object()
+    start = time.perf_counter()
+    for key in keys:
+        if cache.get(key, missing) is missing:
+            cache.put(key, compute(key))
+    elapsed = time.perf_counter() - start
+    report(f"hw.{cache_factory.__name__}", cache.hits, cache.misses)
+    return elapsed
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--operations", type=int, default=10**6)
+    parser.add_argument("--universe", type=int, default=10**5)
+    parser.add_argument("--capacity", type=int, default=10**4)
+    args = parser.parse_args(argv)
+
+    keys = key_stream(args.operations, args.universe)
+    runs = [
+        lambda: run_functools(keys, args.capacity),
+        lambda: run_hw(hw.LRUCache, keys, args.capacity),
+        lambda: run_hw(hw.LFUCache, keys, args.capacity),
+    ]
+    for run in runs:
+        elapsed = run()
+        print(f" {args.operations / elapsed:>14,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
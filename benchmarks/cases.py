@@ -0,0 +1,197 @@
+"""
+The benchmark cases: one entry per operation worth tracking in ``hw``.
+
+Each case receives the input values and returns the number of operations it
+performed, which the harness turns into ops/sec.
+"""
+from typing import Callable, List, Sequence
+
+import hw
+
+
+class Case:
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[List[int]], int],
+        distributions: Sequence[str] = ("random",),
+        max_size: int = None,
+    ):
+        """
+        A named benchmark. ``max_size`` skips sizes where the operation is too
+        slow to be worth timing (e.g. quadratic sorts).
+        """
+        self.name = name
+        self.run = run
+        self.distributions = tuple(distributions)
+        self.max_size = max_size
+
+
+def dynamic_array_append(typecode: str = None) -> Callable[[List[int]], int]:
+    # Appended values are computed on the fly, so untyped arrays pay for the
+    # boxed ints they keep alive, as they would with real data.
+    def run(values: List[int]) -> int:
+        array = hw.DynamicArray(typecode=typecode)
+        for value in values:
+            array.append(value * 1000003)
+        return len(values)
+
+    return run
+
+
+def dynamic_array_get(values: List[int]) -> int:
+    array = hw.DynamicArray()
+    for value in values:
+        array.append(value)
+    for i in range(len(values)):
+        array.get(i)
+    return 2 * len(values)
+
+
+def dynamic_array_insert_front(values: List[int]) -> int:
+    array = hw.DynamicArray()
+    for value in values:
+        array.insert(0, value)
+    return len(values)
+
+
+def dynamic_array_insert_many_front(values: List[int]) -> int:
+    array = hw.DynamicArray()
+    for lo in range(0, len(values), 1024):
+        array.insert_many(0, values[lo:lo + 1024])
+    return len(values)
+
+
+def dynamic_array_delete_back(values: List[int]) -> int:
+    array = hw.DynamicArray()
+    for value in values:
+        array.append(value)
+    for i in range(len(values) - 1, -1, -1):
+        array.delete(i)
+    return 2 * len(values)
+
+
+def linked_list_append(cls, **options) -> Callable[[List[int]], int]:
+    def run(values: List[int]) -> int:
+        linked_list = cls(**options)
+        for value in values:
+            linked_list.append(value)
+        return len(values)
+
+    return run
+
+
+def linked_list_find(cls, indexed: bool = False) -> Callable[[List[int]], int]:
+    def run(values: List[int]) -> int:
+        linked_list = cls(indexed=indexed)
+        for value in values:
+            linked_list.append(value)
+        lookups = values[-10:]
+        for value in lookups:
+            linked_list.find(value)
+        return len(values) + len(lookups)
+
+    return run
+
+
+def positional_insert_middle(cls) -> Callable[[List[int]], int]:
+    def run(values: List[int]) -> int:
+        sequence = cls()
+        for i, value in enumerate(values):
+            sequence.insert(i // 2, value)
+        return len(values)
+
+    return run
+
+
+def queue_drain(values: List[int]) -> int:
+    queue = hw.Queue()
+    for value in values:
+        queue.enqueue(value)
+    while not queue.is_empty():
+        queue.dequeue()
+    return 2 * len(values)
+
+
+def bst_insert_search(balanced: str = None) -> Callable[[List[int]], int]:
+    def run(values: List[int]) -> int:
+        tree = hw.BinarySearchTree(balanced=balanced)
+        for value in values:
+            tree.insert(value)
+        for value in values:
+            tree.search(value)
+        return 2 * len(values)
+
+    return run
+
+
+def bst_traversal(values: List[int]) -> int:
+    tree = hw.BinarySearchTree.from_iterable(values)
+    return len(tree.inorder_traversal())
+
+
+def sort_case(sort: Callable[[List[int]], List[int]]) -> Callable[[List[int]], int]:
+    def run(values: List[int]) -> int:
+        sort(values)
+        return len(values)
+
+    return run
+
+
+ALL_DISTRIBUTIONS = ("random", "sorted", "reversed", "few_unique", "sawtooth")
+
+# Wide-range integer IDs, where radix sort competes with comparison sorts.
+INTEGER_DISTRIBUTIONS = ALL_DISTRIBUTIONS + ("ids32", "ids64")
+
+CASES = [
+    Case("DynamicArray.append", dynamic_array_append()),
+    Case("DynamicArray[q].append", dynamic_array_append("q")),
+    Case("DynamicArray.get", dynamic_array_get),
+    Case("DynamicArray.insert_front", dynamic_array_insert_front, max_size=10**5),
+    Case("DynamicArray.insert_many_front", dynamic_array_insert_many_front),
+    Case("DynamicArray.delete_back", dynamic_array_delete_back),
+    Case("SinglyLinkedList.append", linked_list_append(hw.SinglyLinkedList)),
+    Case("SinglyLinkedList.find", linked_list_find(hw.SinglyLinkedList)),
+    Case("DoublyLinkedList.append", linked_list_append(hw.DoublyLinkedList)),
+    Case("DoublyLinkedList.find", linked_list_find(hw.DoublyLinkedList)),
+    Case("ArrayLinkedList.append", linked_list_append(hw.ArrayLinkedList)),
+    Case(
+        "ArrayLinkedList[q].append",
+        linked_list_append(hw.ArrayLinkedList, typecode="q"),
+    ),
+    Case(
+        "DoublyLinkedList[indexed].find",
+        linked_list_find(hw.DoublyLinkedList, indexed=True),
+    ),
+    Case(
+        "DoublyLinkedList.insert_middle",
+        positional_insert_middle(hw.DoublyLinkedList),
+        max_size=10**4,
+    ),
+    Case(
+        "IndexableSkipList.insert_middle",
+        positional_insert_middle(hw.IndexableSkipList),
+    ),
+    Case("Queue.drain", queue_drain),
+    Case(
+        "BinarySearchTree.insert_search",
+        bst_insert_search(),
+        max_size=10**5,
+    ),
+    Case(
+        "BinarySearchTree[avl].insert_search",
+        bst_insert_search("avl"),
+        distributions=("random", "sorted"),
+    ),
+    Case("BinarySearchTree.inorder_traversal", bst_traversal),
+    Case("insertion_sort", sort_case(hw.insertion_sort), ALL_DISTRIBUTIONS, 10**4),
+    Case("selection_sort", sort_case(hw.selection_sort), ALL_DISTRIBUTIONS, 10**4),
+    Case("bubble_sort", sort_case(hw.bubble_sort), ALL_DISTRIBUTIONS, 10**3),
+    Case("shell_sort", sort_case(hw.shell_sort), ALL_DISTRIBUTIONS),
+    Case("merge_sort", sort_case(hw.merge_sort), INTEGER_DISTRIBUTIONS),
+    Case("adaptive_sort", sort_case(hw.adaptive_sort), ALL_DISTRIBUTIONS),
+    Case("quick_sort", sort_case(hw.quick_sort), INTEGER_DISTRIBUTIONS),
+    Case("counting_sort", sort_case(hw.counting_sort), ALL_DISTRIBUTIONS),
+    Case("radix_sort", sort_case(hw.radix_sort), INTEGER_DISTRIBUTIONS),
+    Case("auto_sort", sort_case(hw.auto_sort), INTEGER_DISTRIBUTIONS),
+]
@@ -0,0 +1,145 @@
+"""
+Compare hw.ThreadSafeQueue with queue.Queue, and hw.AsyncQueue with
+asyncio.Queue, under several producers and consumers.
+
+Run with ``python -m benchmarks.concurrent_queue_bench``.
+"""
+import argparse
+import asyncio
+import queue
+import threading
+import time
+from typing import List
+
+import hw
+
+
+def run_threads(q, items: int, producers: int, consumers: int) -> float:
+    """
+    Move ``items`` values through ``q`` and return the elapsed seconds.
+    Each consumer stops after receiving its share of the values.
+    """
+    per_producer = items // producers
+    total = per_producer * producers
+    shares = [total // consumers + (i < total % consumers) for i in range(consumers)]
+
+    def produce() -> None:
+        for i in range(per_producer):
+            q.put(i)
+
+    def consume(share: int) -> None:
+        for _ in range(share):
+            q.get()
+
+    threads = [threading.Thread(target=produce) for _ in range(producers)]
+    threads += [threading.Thread(target=consume, args=(share,)) for share in shares]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+async def run_tasks(
+    q, items: int, producers: int, consumers: int, batch: int = 0
+) -> float:
+    """
+    The asyncio counterpart of ``run_threads``. With ``batch`` consumers use
+    ``get_batch`` (hw.AsyncQueue only).
+    """
+    per_producer = items // producers
+    total = per_producer * producers
+    shares = [total // consumers + (i < total % consumers) for i in range(consumers)]
+
+    async def produce() -> None:
+        for i in range(per_producer):
+            await q.put(i)
+
+    async def consume(share: int) -> None:
+        while share > 0:
+            if batch:
+                share -= len(await q.get_batch(min(batch, share)))
+            else:
+                await q.get()
+                share -= 1
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[produce() for _ in range(producers)],
+        *[consume(share) for share in shares],
+    )
+    return time.perf_counter() - start
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--consumers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--maxsize", type=int, default=1024)
+    parser.add_argument("--batch", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    print(f"{'queue':<28} {'P':>3} {'C':>3} {'ops/s':>14}")
+    for producers in args.producers:
+        for consumers in args.consumers:
+            runs = [
+                (
+                    "queue.Queue",
+                    lambda: run_threads(
+                        queue.Queue(args.maxsize), args.items, producers, consumers
+                    ),
+                ),
+                (
+                    "hw.ThreadSafeQueue",
+                    lambda: run_threads(
+                        hw.ThreadSafeQueue(args.maxsize),
+                        args.items,
+                        producers,
+                        consumers,
+                    ),
+                ),
+                (
+                    "asyncio.Queue",
+                    lambda: asyncio.run(
+                        run_tasks(
+                            asyncio.Queue(args.maxsize),
+                            args.items,
+                            producers,
+                            consumers,
+                        )
+                    ),
+                ),
+                (
+                    "hw.AsyncQueue",
+                    lambda: asyncio.run(
+                        run_tasks(
+                            hw.AsyncQueue(args.maxsize),
+                            args.items,
+                            producers,
+                            consumers,
+                        )
+                    ),
+                ),
+                (
+                    "hw.AsyncQueue.get_batch",
+                    lambda: asyncio.run(
+                        run_tasks(
+                            hw.AsyncQueue(args.maxsize),
+                            args.items,
+                            producers,
+                            consumers,
+                            batch=args.batch,
+                        )
+                    ),
+                ),
+            ]
+            for name, run in runs:
+                elapsed = run()
+                rate = args.items / elapsed
+                print(f"{name:<28} {producers:>3} {consumers:>3} {rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
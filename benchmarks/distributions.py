@@ -0,0 +1,52 @@
+"""
+Input distributions shared by the benchmarks.
+"""
+import random
+from typing import Callable, Dict, List
+
+
+def random_values(n: int, rng: random.Random) -> List[int]:
+    return [rng.randrange(n * 10) for _ in range(n)]
+
+
+def sorted_values(n: int, rng: random.Random) -> List[int]:
+    return list(range(n))
+
+
+def reversed_values(n: int, rng: random.Random) -> List[int]:
+    return list(range(n, 0, -1))
+
+
+def few_unique_values(n: int, rng: random.Random) -> List[int]:
+    return [rng.randrange(8) for _ in range(n)]
+
+
+def sawtooth_values(n: int, rng: random.Random) -> List[int]:
+    tooth = max(n // 16, 1)
+    return [i % tooth for i in range(n)]
+
+
+def ids32_values(n: int, rng: random.Random) -> List[int]:
+    return [rng.getrandbits(32) for _ in range(n)]
+
+
+def ids64_values(n: int, rng: random.Random) -> List[int]:
+    return [rng.getrandbits(64) - (1 << 63) for _ in range(n)]
+
+
+DISTRIBUTIONS: Dict[str, Callable[[int, random.Random], List[int]]] = {
+    "random": random_values,
+    "sorted": sorted_values,
+    "reversed": reversed_values,
+    "few_unique": few_unique_values,
+    "sawtooth": sawtooth_values,
+    "ids32": ids32_values,
+    "ids64": ids64_values,
+}
+
+
+def generate(name: str, n: int, seed: int = 0) -> List[int]:
+    """
+    Generate ``n`` values from the named distribution, reproducibly.
+    """
+    return DISTRIBUTIONS[name](n, random.Random(f"{name}:{n}:{seed}"))
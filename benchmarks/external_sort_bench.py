@@ -0,0 +1,62 @@
+"""
+Time hw.external_sort on a file of random int64 records under several
+memory limits.
+
+Run with ``python -m benchmarks.external_sort_bench``. The input is written
+to a temporary directory; throughput is input megabytes per second, and the
+in-memory ``hw.merge_sort`` of the same records is shown for reference.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from array import array
+from typing import List
+
+import hw
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=2 * 10**6)
+    parser.add_argument(
+        "--memory-limits",
+        type=int,
+        nargs="+",
+        default=[1 << 20, 8 << 20, 64 << 20, 1 << 30],
+        help="bytes",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    records = array("q", (rng.getrandbits(63) for _ in range(args.items)))
+    megabytes = len(records) * records.itemsize / 2**20
+
+    start = time.perf_counter()
+    hw.merge_sort(records.tolist())
+    in_memory = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = os.path.join(workdir, "input.bin")
+        output_path = os.path.join(workdir, "output.bin")
+        with open(input_path, "wb") as target:
+            records.tofile(target)
+        del records
+
+        header = ("memory limit", "runs", "passes", "seconds", "MB/s")
+        print("{:>14} {:>6} {:>6} {:>9} {:>8}".format(*header))
+        print(f"{'in memory':>14} {'-':>6} {'-':>6} {in_memory:9.3f} {'-':>8}")
+        for limit in args.memory_limits:
+            start = time.perf_counter()
+            stats = hw.external_sort(input_path, output_path, memory_limit=limit)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{limit:>14,} {stats.runs:>6} {stats.merge_passes:>6} "
+                f"{elapsed:9.3f} {megabytes / elapsed:8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Timing, memory measurement and baseline comparison for the benchmark suite.
+"""
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List
+
+from benchmarks.cases import Case
+from benchmarks.distributions import generate
+
+
+def measure(case: Case, values: List[int], repeat: int, memory: bool) -> Dict[str, Any]:
+    """
+    Time ``case`` on a fresh copy of ``values`` ``repeat`` times, keeping the
+    best run, then optionally run it once more under tracemalloc to record the
+    peak memory it allocated.
+    """
+    best = float("inf")
+    ops = 0
+    for _ in range(repeat):
+        data = list(values)
+        gc.collect()
+        start = time.perf_counter()
+        ops = case.run(data)
+        best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        data = list(values)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            case.run(data)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "seconds": best,
+        "ops": ops,
+        "ops_per_sec": ops / best if best > 0 else float("inf"),
+        "peak_bytes": peak,
+    }
+
+
+def run_suite(
+    cases: Iterable[Case],
+    sizes: Iterable[int],
+    distributions: Iterable[str],
+    repeat: int = 3,
+    memory: bool = True,
+    log=print,
+) -> List[Dict[str, Any]]:
+    """
+    Run every case at every size and distribution it supports.
+    """
+    results = []
+    distributions = set(distributions)
+    for case in cases:
+        for distribution in case.distributions:
+            if distribution not in distributions:
+                continue
+            for n in sizes:
+                if case.max_size is not None and n > case.max_size:
+                    continue
+                result = {"case": case.name, "distribution": distribution, "n": n}
+                result.update(measure(case, generate(distribution, n), repeat, memory))
+                if result["peak_bytes"] is not None:
+                    result["bytes_per_element"] = result["peak_bytes"] / n
+                results.append(result)
+                log(format_result(result))
+    return results
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    peak = result["peak_bytes"]
+    if peak is None:
+        memory_text = f"{'-':>16} {'-':>12}"
+    else:
+        memory_text = (
+            f"{peak / 1024:12.1f} KiB {result['bytes_per_element']:>7.1f} B/elem"
+        )
+    return (
+        f"{result['case']:<40} {result['distribution']:<10} {result['n']:>9} "
+        f"{result['ops_per_sec']:>14,.0f} ops/s {memory_text}"
+    )
+
+
+def save(path: str, results: List[Dict[str, Any]]) -> None:
+    document = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as stream:
+        json.dump(document, stream, indent=2)
+
+
+def load(path: str) -> List[Dict[str, Any]]:
+    with open(path) as stream:
+        return json.load(stream)["results"]
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float
+) -> List[str]:
+    """
+    Describe every result that is slower, or uses more peak memory, than the
+    matching baseline entry by more than ``threshold`` (a fraction).
+    """
+    previous = {(r["case"], r["distribution"], r["n"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["case"], result["distribution"], result["n"]))
+        if old is None:
+            continue
+        label = f"{result['case']} [{result['distribution']}, n={result['n']}]"
+        if result["ops_per_sec"] < old["ops_per_sec"] * (1 - threshold):
+            change = result["ops_per_sec"] / old["ops_per_sec"] - 1
+            regressions.append(f"{label}: throughput {change:+.1%}")
+        if (
+            result["peak_bytes"] is not None
+            and old.get("peak_bytes")
+            and result["peak_bytes"] > old["peak_bytes"] * (1 + threshold)
+        ):
+            change = result["peak_bytes"] / old["peak_bytes"] - 1
+            regressions.append(f"{label}: peak memory {change:+.1%}")
+    return regressions
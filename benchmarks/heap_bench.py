@@ -0,0 +1,103 @@
+"""
+Compare hw.PriorityQueue with heapq on push/pop, heapify and push_pop.
+
+Run with ``python -m benchmarks.heap_bench``. The heapq baseline stores
+``(priority, seq, value)`` tuples, which gives it the same stable ordering
+as the priority queue but no handles for changing priorities.
+"""
+import argparse
+import heapq
+import random
+import time
+from typing import Callable, List
+
+import hw
+
+
+def timed(run: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def heapq_push_pop(priorities: List[int]) -> None:
+    heap = []
+    for seq, priority in enumerate(priorities):
+        heapq.heappush(heap, (priority, seq, seq))
+    while heap:
+        heapq.heappop(heap)
+
+
+def heapq_heapify(priorities: List[int]) -> None:
+    heap = [(priority, seq, seq) for seq, priority in enumerate(priorities)]
+    heapq.heapify(heap)
+
+
+def heapq_pushpop(priorities: List[int]) -> None:
+    heap = [(priority, seq, seq) for seq, priority in enumerate(priorities)]
+    heapq.heapify(heap)
+    seq = len(heap)
+    for priority in priorities:
+        heapq.heappushpop(heap, (priority, seq, seq))
+        seq += 1
+
+
+def queue_push_pop(priorities: List[int]) -> None:
+    queue = hw.PriorityQueue()
+    for seq, priority in enumerate(priorities):
+        queue.enqueue(seq, priority)
+    while not queue.is_empty():
+        queue.dequeue()
+
+
+def queue_heapify(priorities: List[int]) -> None:
+    hw.PriorityQueue(priorities)
+
+
+def queue_pushpop(priorities: List[int]) -> None:
+    queue = hw.PriorityQueue(priorities)
+    for priority in priorities:
+        queue.push_pop(priority)
+
+
+def queue_decrease_key(priorities: List[int]) -> None:
+    queue = hw.PriorityQueue()
+    handles = [queue.enqueue(seq, priority) for seq, priority in enumerate(priorities)]
+    for handle in handles:
+        queue.decrease_key(handle, handle.priority // 2)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'n':>8} {'operation':<14} {'heapq (s)':>10} {'hw (s)':>10}")
+    baselines = {
+        "push+pop": heapq_push_pop,
+        "heapify": heapq_heapify,
+        "push_pop": heapq_pushpop,
+        "decrease_key": None,
+    }
+    variants = {
+        "push+pop": queue_push_pop,
+        "heapify": queue_heapify,
+        "push_pop": queue_pushpop,
+        "decrease_key": queue_decrease_key,
+    }
+    for n in args.sizes:
+        priorities = [rng.randrange(n) for _ in range(n)]
+        for name, variant in variants.items():
+            baseline = baselines[name]
+            if baseline is None:
+                baseline_text = f"{'n/a':>10}"
+            else:
+                baseline_text = f"{timed(lambda: baseline(priorities)):10.4f}"
+            elapsed = timed(lambda: variant(priorities))
+            print(f"{n:>8} {name:<14} {baseline_text} {elapsed:10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Find the size at which the NumPy fast path of the sort functions beats
+sorting the same numbers as a list in pure Python.
+
+Run with ``python -m benchmarks.numpy_sort_bench`` (requires NumPy). For
+each size the same random doubles are sorted as a list, and as an
+``array("d")`` that ``hw`` hands to ``numpy.sort``. Timings are the best
+of ``--repeat`` runs.
+"""
+import argparse
+import random
+import sys
+import time
+from array import array
+from typing import Any, Callable, List
+
+import hw
+
+
+def best_of(repeat: int, run: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[2**k for k in range(1, 21, 2)]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if hw.np is None:
+        print("NumPy is not installed; the sort functions use pure Python only.")
+        return 1
+
+    rng = random.Random(args.seed)
+    sorts = (hw.shell_sort, hw.merge_sort, hw.quick_sort)
+    crossover = dict.fromkeys(sort.__name__ for sort in sorts)
+    print(f"{'sort':<12} {'n':>9} {'list (s)':>12} {'numpy (s)':>12} {'speedup':>9}")
+    for n in args.sizes:
+        values = [rng.random() for _ in range(n)]
+        typed = array("d", values)
+        for sort in sorts:
+            name = sort.__name__
+            pure = best_of(args.repeat, lambda: sort(values))
+            vector = best_of(args.repeat, lambda: sort(typed))
+            if crossover[name] is None and vector < pure:
+                crossover[name] = n
+            print(f"{name:<12} {n:>9} {pure:12.6f} {vector:12.6f} {pure / vector:9.1f}")
+    for name, n in crossover.items():
+        print(f"{name}: NumPy path faster from n = {n}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Measure how parallel merge_sort and quick_sort scale with the worker count.
+
+Run with ``python -m benchmarks.parallel_sort_bench``. Each size is sorted
+once in-process and then with ``parallel=True`` for 1, 2, 4, ... workers up
+to the number of cores. Speedup is relative to the in-process sort.
+"""
+import argparse
+import os
+import random
+import time
+from typing import List
+
+import hw
+
+
+def worker_counts(limit: int) -> List[int]:
+    counts = []
+    workers = 1
+    while workers < limit:
+        counts.append(workers)
+        workers *= 2
+    return counts + [limit]
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**7])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--floats", action="store_true", help="sort floats, not ints")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'sort':<12} {'n':>10} {'workers':>8} {'seconds':>10} {'speedup':>8}")
+    for n in args.sizes:
+        if args.floats:
+            data = [rng.random() for _ in range(n)]
+        else:
+            data = [rng.randrange(n) for _ in range(n)]
+        for sort in (hw.merge_sort, hw.quick_sort):
+            start = time.perf_counter()
+            sort(data)
+            baseline = time.perf_counter() - start
+            name = sort.__name__
+            print(f"{name:<12} {n:>10} {'-':>8} {baseline:10.3f} {1:8.2f}")
+            for workers in worker_counts(args.max_workers):
+                start = time.perf_counter()
+                sort(data, parallel=True, workers=workers, parallel_threshold=0)
+                elapsed = time.perf_counter() - start
+                speedup = baseline / elapsed
+                print(f"{name:<12} {n:>10} {workers:>8} {elapsed:10.3f} {speedup:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
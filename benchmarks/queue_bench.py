@@ -0,0 +1,81 @@
+"""
+Compare the ring-buffer ``hw.Queue`` with the original list-backed queue.
+
+Run with ``python -m benchmarks.queue_bench``. The list baseline dequeues with
+``list.pop(0)`` and is quadratic, so it is skipped above ``--list-limit``.
+"""
+import argparse
+import time
+from typing import List
+
+import hw
+
+
+class ListQueue:
+    """
+    The list-backed queue that ``hw.Queue`` replaced.
+    """
+
+    def __init__(self):
+        self.queue = []
+
+    def enqueue(self, value: int) -> None:
+        self.queue.append(value)
+
+    def dequeue(self) -> int:
+        if self.queue:
+            return self.queue.pop(0)
+        raise IndexError("Dequeue from empty queue")
+
+
+def drain(queue_factory, n: int) -> float:
+    """
+    Enqueue ``n`` values and dequeue them all, returning the elapsed seconds.
+    """
+    queue = queue_factory()
+    start = time.perf_counter()
+    for i in range(n):
+        queue.enqueue(i)
+    for _ in range(n):
+        queue.dequeue()
+    return time.perf_counter() - start
+
+
+def drain_bulk(n: int, batch: int = 1024) -> float:
+    """
+    Like ``drain`` but using ``enqueue_many``/``dequeue_many`` in batches.
+    """
+    queue = hw.Queue()
+    start = time.perf_counter()
+    for lo in range(0, n, batch):
+        queue.enqueue_many(range(lo, min(lo + batch, n)))
+    while not queue.is_empty():
+        queue.dequeue_many(batch)
+    return time.perf_counter() - start
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10**3, 10**4, 10**5, 10**6, 10**7],
+    )
+    parser.add_argument("--list-limit", type=int, default=10**5)
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>10} {'list (s)':>12} {'ring (s)':>12} {'bulk (s)':>12}")
+    for n in args.sizes:
+        baseline = drain(ListQueue, n) if n <= args.list_limit else None
+        ring = drain(hw.Queue, n)
+        bulk = drain_bulk(n)
+        if baseline is None:
+            baseline_text = f"{'skipped':>12}"
+        else:
+            baseline_text = f"{baseline:12.4f}"
+        print(f"{n:>10} {baseline_text} {ring:12.4f} {bulk:12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,74 @@
-from typing import List, Any, Dict, Set, Generator
+import asyncio
+import bisect
+import heapq
+import mmap
+import operator
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter, deque
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import accumulate, islice, repeat
+from multiprocessing.shared_memory import SharedMemory
+from queue import Empty, Full
+from typing import (
+    List,
+    Any,
+    BinaryIO,
+    Dict,
+    Set,
+    Generator,
+    Iterable,
+    Iterator,
+    Callable,
+    Tuple,
+    TextIO,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _allocate(capacity: int, typecode: str = None):
+    """
+    Allocate fixed storage: a list of ``None`` or, given an ``array`` module
+    typecode, a zero-filled typed array.
+    """
+    if typecode is None:
+        return [None] * capacity
+    return array(typecode, bytes(capacity * array(typecode).itemsize))
+
+
+def _buffer(storage, typecode: str) -> memoryview:
+    """
+    A zero-copy memoryview over typed storage.
+    """
+    if typecode is None:
+        raise TypeError("Only typed arrays expose a buffer")
+    return memoryview(storage)
 
 
 class StaticArray:
-    def __init__(self, capacity: int):
+    def __init__(self, capacity: int, typecode: str = None):
         """
         Initialize a static array of a given capacity.
+
+        With an ``array`` module ``typecode`` (e.g. ``"q"`` for signed 64-bit
+        ints or ``"d"`` for doubles) values are stored unboxed in a
+        zero-filled ``array.array`` instead of a list of Python objects.
         """
         self.capacity = capacity
-        self.array = [None] * capacity
+        self.typecode = typecode
+        self.array = _allocate(capacity, typecode)
 
     def set(self, index: int, value: int) -> None:
         """
@@ -27,46 +88,440 @@ class StaticArray:
         else:
             raise IndexError("Index out of bounds")
 
+    def buffer(self) -> memoryview:
+        """
+        Returns a zero-copy memoryview of a typed array's storage, suitable for
+        ``numpy.frombuffer`` and friends.
+        """
+        return _buffer(self.array, self.typecode)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        """
+        Buffer protocol hook (Python 3.12+), so ``memoryview(array)`` works.
+        """
+        return self.buffer()
+
 
 class DynamicArray:
-    def __init__(self):
+    def __init__(
+        self,
+        typecode: str = None,
+        capacity: int = 0,
+        growth_factor: float = 2.0,
+        shrink: bool = True,
+    ):
         """
         Initialize an empty dynamic array.
+
+        Values live in a fixed-size buffer (see ``StaticArray``) that is
+        reallocated ``growth_factor`` times larger when full. When ``shrink``
+        is set and the array falls to ``1 / growth_factor**2`` of its capacity
+        the buffer is reallocated ``growth_factor`` times smaller; the gap
+        between the two thresholds stops alternating appends and deletes from
+        reallocating every time.
+
+        With an ``array`` module ``typecode`` values are stored unboxed in an
+        ``array.array``.
+        """
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than 1")
+        self.typecode = typecode
+        self.growth_factor = growth_factor
+        self.shrink = shrink
+        self.min_capacity = capacity
+        self.array = _allocate(capacity, typecode)
+        self.filler = _allocate(1, typecode)[0]
+        self.count = 0
+        self.resize_count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def capacity(self) -> int:
         """
-        self.array = []
+        Number of values the current buffer can hold without reallocating.
+        """
+        return len(self.array)
 
     def append(self, value: int) -> None:
         """
         Add a value to the end of the dynamic array.
         """
-        self.array.append(value)
+        if self.count == len(self.array):
+            self._grow(self.count + 1)
+        self.array[self.count] = value
+        self.count += 1
 
     def insert(self, index: int, value: int) -> None:
         """
         Insert a value at a particular index.
         """
+        if not 0 <= index <= self.count:
+            raise IndexError("Index out of bounds")
+        if self.count == len(self.array):
+            self._grow(self.count + 1)
+        # The buffer's own insert shifts the tail with a single memmove; the
+        # spare slot that falls off the end keeps the capacity unchanged.
         self.array.insert(index, value)
+        self.array.pop()
+        self.count += 1
 
     def delete(self, index: int) -> None:
         """
         Delete the value at a particular index.
         """
-        if 0 <= index < len(self.array):
-            self.array.pop(index)
-        else:
+        if not 0 <= index < self.count:
             raise IndexError("Index out of bounds")
+        del self.array[index]
+        self.array.append(self.filler)
+        self.count -= 1
+        self._maybe_shrink()
 
     def get(self, index: int) -> int:
         """
         Retrieve the value at a particular index.
         """
-        if 0 <= index < len(self.array):
+        if 0 <= index < self.count:
             return self.array[index]
         else:
             raise IndexError("Index out of bounds")
 
+    def extend(self, values: Iterable[int]) -> None:
+        """
+        Add every value from an iterable to the end of the dynamic array.
+        """
+        self._replace(self.count, self.count, values)
+
+    def insert_many(self, index: int, values: Iterable[int]) -> None:
+        """
+        Insert values starting at a particular index, shifting the tail once.
+        """
+        if not 0 <= index <= self.count:
+            raise IndexError("Index out of bounds")
+        self._replace(index, index, values)
+
+    def delete_range(self, start: int, stop: int) -> None:
+        """
+        Delete the values in ``[start, stop)``, shifting the tail once.
+        """
+        if not 0 <= start <= stop <= self.count:
+            raise IndexError("Index out of bounds")
+        self._replace(start, stop, ())
+
+    def get_slice(self, start: int, stop: int) -> "ArrayView":
+        """
+        Returns a view of the values in ``[start, stop)`` without copying them.
+        """
+        if not 0 <= start <= stop <= self.count:
+            raise IndexError("Index out of bounds")
+        return ArrayView(self, start, stop)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            if step == 1:
+                return self.array[start:max(start, stop)]
+            values = [self.array[i] for i in range(start, stop, step)]
+            return self._coerce(values)
+        return self.array[self._normalize(index)]
+
+    def __setitem__(self, index, value) -> None:
+        if not isinstance(index, slice):
+            self.array[self._normalize(index)] = value
+            return
+        start, stop, step = index.indices(self.count)
+        if step == 1:
+            self._replace(start, max(start, stop), value)
+            return
+        positions = range(start, stop, step)
+        values = list(value)
+        if len(values) != len(positions):
+            raise ValueError(
+                f"attempt to assign sequence of size {len(values)} "
+                f"to extended slice of size {len(positions)}"
+            )
+        for i, item in zip(positions, values):
+            self.array[i] = item
+
+    def __iter__(self) -> Iterator[int]:
+        return islice(self.array, self.count)
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Make room for at least ``capacity`` values. The reserved capacity is
+        also kept as a floor that deletes never shrink below.
+        """
+        self.min_capacity = max(self.min_capacity, capacity)
+        if capacity > len(self.array):
+            self._resize(capacity)
+
+    def shrink_to_fit(self) -> None:
+        """
+        Release unused capacity and drop any floor set by ``reserve``.
+        """
+        self.min_capacity = 0
+        if len(self.array) != self.count:
+            self._resize(self.count)
+
+    def buffer(self) -> memoryview:
+        """
+        Returns a zero-copy memoryview of a typed array's values, suitable for
+        ``numpy.frombuffer`` and friends. While a view is alive, inserts and
+        deletes raise ``BufferError``; once the array reallocates, the view
+        keeps pointing at the old buffer.
+        """
+        return _buffer(self.array, self.typecode)[:self.count]
+
+    def __buffer__(self, flags: int) -> memoryview:
+        """
+        Buffer protocol hook (Python 3.12+), so ``memoryview(array)`` works.
+        """
+        return self.buffer()
+
+    def _normalize(self, index: int) -> int:
+        """
+        Resolve a possibly negative index, checking bounds.
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Index out of bounds")
+        return index
+
+    def _coerce(self, values: Iterable[int]):
+        """
+        Copy values into the storage type, so they can be slice-assigned.
+        """
+        return list(values) if self.typecode is None else array(self.typecode, values)
+
+    def _replace(self, start: int, stop: int, values: Iterable[int]) -> None:
+        """
+        Replace ``[start, stop)`` with ``values``, moving the tail at most
+        once, so a batch edit of k values costs O(n + k).
+        """
+        values = self._coerce(values)
+        delta = len(values) - (stop - start)
+        if self.count + delta > len(self.array):
+            self._grow(self.count + delta)
+        capacity = len(self.array)
+        if start == self.count:
+            # Appending only overwrites spare slots.
+            self.array[start:start + len(values)] = values
+        else:
+            # Resizing slice assignment moves the tail with one memmove; the
+            # spare slots at the end absorb the change in length.
+            self.array[start:stop] = values
+            if delta > 0:
+                del self.array[capacity:]
+            elif delta < 0:
+                self.array.extend(self._coerce([self.filler] * -delta))
+        self.count += delta
+        if delta < 0:
+            self._maybe_shrink()
+
+    def _grow(self, minimum: int) -> None:
+        """
+        Reallocate to hold at least ``minimum`` values, growing geometrically.
+        """
+        capacity = len(self.array)
+        self._resize(max(minimum, int(capacity * self.growth_factor), capacity + 1))
+
+    def _maybe_shrink(self) -> None:
+        """
+        Reallocate smaller once the array is at most ``1 / growth_factor**2``
+        full.
+        """
+        capacity = len(self.array)
+        if (
+            self.shrink
+            and capacity > self.min_capacity
+            and self.count <= capacity / (self.growth_factor * self.growth_factor)
+        ):
+            self._resize(
+                max(int(capacity / self.growth_factor), self.min_capacity, self.count)
+            )
+
+    def _resize(self, capacity: int) -> None:
+        """
+        Move the values into a newly allocated buffer of the given capacity.
+        """
+        storage = _allocate(capacity, self.typecode)
+        storage[:self.count] = self.array[:self.count]
+        self.array = storage
+        self.resize_count += 1
+
+
+class ArrayView:
+    def __init__(self, source: DynamicArray, start: int, stop: int):
+        """
+        A window onto ``source[start:stop]`` that reads and writes through to
+        the source's buffer instead of copying. Inserting into or deleting
+        from the source shifts the values the view sees; once the source
+        shrinks below ``stop``, every access raises ``IndexError``.
+        """
+        self.source = source
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("ArrayView slices must be contiguous")
+            return ArrayView(
+                self.source, self.start + start, self.start + max(start, stop)
+            )
+        return self.source.array[self._normalize(index)]
+
+    def __setitem__(self, index: int, value: int) -> None:
+        if isinstance(index, slice):
+            raise TypeError("ArrayView does not support slice assignment")
+        self.source.array[self._normalize(index)] = value
+
+    def __iter__(self) -> Iterator[int]:
+        self._check_source()
+        return islice(self.source.array, self.start, self.stop)
+
+    def tolist(self) -> List[int]:
+        """
+        Copy the viewed values into a list.
+        """
+        self._check_source()
+        return list(self.source.array[self.start:self.stop])
+
+    def buffer(self) -> memoryview:
+        """
+        Returns a zero-copy memoryview of the viewed values of a typed array.
+        """
+        self._check_source()
+        return _buffer(self.source.array, self.source.typecode)[self.start:self.stop]
+
+    def _check_source(self) -> None:
+        """
+        Raise ``IndexError`` if the source no longer holds the whole view.
+        """
+        if self.stop > self.source.count:
+            raise IndexError("View extends past the end of the array")
+
+    def _normalize(self, index: int) -> int:
+        """
+        Translate an index into the view into an index into the source buffer.
+        """
+        self._check_source()
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Index out of bounds")
+        return self.start + index
+
+
+def _index_add(index: Dict[Any, Dict[Any, None]], node) -> None:
+    """
+    Record a node under its value in a linked list's value index. Each value
+    maps to an insertion-ordered dict used as an ordered set of nodes, kept
+    in list order so its first node is the one ``find`` and ``delete`` use.
+    The node must come after every other node holding its value.
+    """
+    nodes = index.get(node.value)
+    if nodes is None:
+        index[node.value] = {node: None}
+    else:
+        nodes[node] = None
+
+
+def _index_remove(index: Dict[Any, Dict[Any, None]], node) -> None:
+    """
+    Forget a node in a linked list's value index.
+    """
+    nodes = index[node.value]
+    del nodes[node]
+    if not nodes:
+        del index[node.value]
+
+
+def _index_insert(index: Dict[Any, Dict[Any, None]], node, rank: int) -> None:
+    """
+    Record a node under its value after the first ``rank`` nodes already
+    holding it. Costs O(k) for a value held by k nodes unless the node goes
+    last.
+    """
+    nodes = index.get(node.value)
+    if nodes is None or rank >= len(nodes):
+        _index_add(index, node)
+        return
+    ordered = list(nodes)
+    ordered.insert(rank, node)
+    index[node.value] = dict.fromkeys(ordered)
+
+
+def _index_rebuild(index: Dict[Any, Dict[Any, None]], nodes: Iterable[Any]) -> None:
+    """
+    Re-record every node in list order, after relinking that reordered them.
+    """
+    index.clear()
+    for node in nodes:
+        _index_add(index, node)
+
+
+def _index_reverse(index: Dict[Any, Dict[Any, None]]) -> None:
+    """
+    Flip the order of every value's nodes, after reversing the list.
+    """
+    for value, nodes in index.items():
+        index[value] = dict.fromkeys(reversed(nodes))
+
+
+def _index_rank(start, node, nodes: Dict[Any, None], step: str) -> int:
+    """
+    Count the members of ``nodes`` met walking from ``start`` along ``step``
+    links until reaching ``node``.
+    """
+    rank = 0
+    current = start
+    while current is not node:
+        if current in nodes:
+            rank += 1
+        current = getattr(current, step)
+    return rank
+
+
+def _index_prepend(index: Dict[Any, Dict[Any, None]], nodes: Iterable[Any]) -> None:
+    """
+    Record ``nodes``, given in list order, ahead of every node already
+    indexed, after they were spliced onto the front of the list.
+    """
+    ranks = {}
+    for node in nodes:
+        rank = ranks.get(node.value, 0)
+        _index_insert(index, node, rank)
+        ranks[node.value] = rank + 1
+
+
+def _write_values(
+    stream: TextIO, values: Iterable[Any], separator: str, chunk_size: int
+) -> None:
+    """
+    Write ``values`` joined by ``separator`` and terminated by ``None`` and a
+    newline, formatting ``chunk_size`` values per ``write`` call.
+    """
+    chunk = []
+    for value in values:
+        chunk.append(str(value))
+        if len(chunk) == chunk_size:
+            chunk.append("")
+            stream.write(separator.join(chunk))
+            chunk = []
+    chunk.append("None\n")
+    stream.write(separator.join(chunk))
+
 
 class Node:
+    __slots__ = ("value", "next")
+
     def __init__(self, value: int):
         """
         Initialize a node.
@@ -76,72 +531,127 @@ class Node:
 
 
 class SinglyLinkedList:
-    def __init__(self):
+    def __init__(self, indexed: bool = False):
         """
         Initialize an empty singly linked list.
+
+        With ``indexed`` the list keeps a map from each value to the nodes
+        holding it, and from each node to its predecessor, so ``find``,
+        ``delete`` and ``delete_node`` run in O(1) on average. Values must
+        then be hashable. Each value's nodes are kept in list order, so
+        ``find`` and ``delete`` act on the first node with the value, as on
+        an unindexed list.
         """
         self.head = None
         self.tail = None
-        self.size = 0
+        self.count = 0
+        self.index = {} if indexed else None
+        self.predecessors = {} if indexed else None
+
+    def __len__(self) -> int:
+        return self.count
 
     def append(self, value: int) -> None:
         """
         Add a node with a value to the end of the linked list.
         """
         new_node = Node(value)
+        if self.index is not None:
+            _index_add(self.index, new_node)
+            self.predecessors[new_node] = self.tail
         if self.tail:
             self.tail.next = new_node
         else:
             self.head = new_node
         self.tail = new_node
-        self.size += 1
+        self.count += 1
 
     def insert(self, position: int, value: int) -> None:
         """
         Insert a node with a value at a particular position.
         """
-        if position < 0 or position > self.size:
+        if position < 0 or position > self.count:
             raise IndexError("Index out of bounds")
 
         new_node = Node(value)
         if position == 0:
+            prev = None
             new_node.next = self.head
             self.head = new_node
             if not self.tail:
                 self.tail = new_node
+        elif position == self.count:
+            prev = self.tail
+            prev.next = new_node
+            self.tail = new_node
         else:
-            current = self.head
+            prev = self.head
             for _ in range(position - 1):
-                current = current.next
-            new_node.next = current.next
-            current.next = new_node
+                prev = prev.next
+            new_node.next = prev.next
+            prev.next = new_node
             if new_node.next is None:
                 self.tail = new_node
-        self.size += 1
+        if self.index is not None:
+            nodes = self.index.get(value)
+            if new_node is self.tail or not nodes:
+                _index_add(self.index, new_node)
+            else:
+                rank = _index_rank(self.head, new_node, nodes, "next")
+                _index_insert(self.index, new_node, rank)
+            self.predecessors[new_node] = prev
+            if new_node.next:
+                self.predecessors[new_node.next] = new_node
+        self.count += 1
 
     def delete(self, value: int) -> None:
         """
         Delete the first node with a specific value.
         """
+        if self.index is not None:
+            nodes = self.index.get(value)
+            if nodes:
+                node = next(iter(nodes))
+                self._unlink(node, self.predecessors[node])
+            return
+
         current = self.head
         prev = None
         while current:
             if current.value == value:
-                if prev:
-                    prev.next = current.next
-                else:
-                    self.head = current.next
-                if current == self.tail:
-                    self.tail = prev
-                self.size -= 1
+                self._unlink(current, prev)
                 return
             prev = current
             current = current.next
 
+    def delete_node(self, node: Node) -> None:
+        """
+        Unlink a node that belongs to this list. O(1) on indexed lists,
+        otherwise the predecessor has to be found by walking from the head.
+        """
+        if self.index is not None:
+            if node not in self.predecessors:
+                raise ValueError("Node is not in the list")
+            self._unlink(node, self.predecessors[node])
+            return
+
+        prev = None
+        current = self.head
+        while current is not node:
+            if current is None:
+                raise ValueError("Node is not in the list")
+            prev = current
+            current = current.next
+        self._unlink(node, prev)
+
     def find(self, value: int) -> Node:
         """
         Find a node with a specific value.
         """
+        if self.index is not None:
+            nodes = self.index.get(value)
+            return next(iter(nodes)) if nodes else None
+
         current = self.head
         while current:
             if current.value == value:
@@ -153,23 +663,61 @@ class SinglyLinkedList:
         """
         Returns the number of elements in the linked list.
         """
-        return self.size
+        return self.count
 
     def is_empty(self) -> bool:
         """
         Checks if the linked list is empty.
         """
-        return self.size == 0
+        return self.count == 0
 
-    def print_list(self) -> None:
+    def __iter__(self) -> Iterator[int]:
+        return self.values()
+
+    def values(self) -> Generator[int, None, None]:
         """
-        Prints all elements in the linked list.
+        Lazily yield the values from head to tail.
+        """
+        current = self.head
+        while current:
+            yield current.value
+            current = current.next
+
+    def nodes(self) -> Generator[Node, None, None]:
+        """
+        Lazily yield the nodes from head to tail.
         """
         current = self.head
         while current:
-            print(current.value, end=" -> ")
+            yield current
+            current = current.next
+
+    def to_list(self) -> List[int]:
+        """
+        Returns the values as a list.
+        """
+        values = [None] * self.count
+        current = self.head
+        for i in range(self.count):
+            values[i] = current.value
             current = current.next
-        print("None")
+        return values
+
+    def write_to(self, stream: TextIO, chunk_size: int = 4096) -> None:
+        """
+        Write the list as ``1 -> 2 -> None`` followed by a newline, joining
+        ``chunk_size`` values per ``write`` call.
+        """
+        _write_values(stream, self.values(), " -> ", chunk_size)
+
+    def print_list(self) -> None:
+        """
+        Prints all elements in the linked list.
+        """
+        self.write_to(sys.stdout)
+
+    def __reversed__(self) -> Iterator[int]:
+        return reversed(self.to_list())
 
     def reverse(self) -> None:
         """
@@ -180,9 +728,13 @@ class SinglyLinkedList:
         while current:
             next_node = current.next
             current.next = prev
+            if self.predecessors is not None:
+                self.predecessors[current] = next_node
             prev = current
             current = next_node
-        self.head = prev
+        self.head, self.tail = prev, self.head
+        if self.index is not None:
+            _index_reverse(self.index)
 
     def get_head(self) -> Node:
         """
@@ -196,8 +748,168 @@ class SinglyLinkedList:
         """
         return self.tail
 
+    def concat(self, other: "SinglyLinkedList") -> None:
+        """
+        Move every node of ``other`` to the end of this list, leaving
+        ``other`` empty. O(1) unless this list is indexed, in which case the
+        moved nodes are indexed in O(len(other)).
+        """
+        self.splice(self.tail, other)
+
+    def splice(self, node: Node, other: "SinglyLinkedList") -> None:
+        """
+        Move every node of ``other`` in after ``node`` (or to the front when
+        ``node`` is None), leaving ``other`` empty. Costs O(1), plus indexing
+        the moved nodes on indexed lists, which reindexes the whole list when
+        they land between two nodes.
+        """
+        if other is self:
+            raise ValueError("Cannot splice a list into itself")
+        if other.head is None:
+            return
+        first, last = other.head, other.tail
+        after = node.next if node else self.head
+        if self.index is not None:
+            prev = node
+            for current in other.nodes():
+                if after is None:
+                    _index_add(self.index, current)
+                self.predecessors[current] = prev
+                prev = current
+            if after:
+                self.predecessors[after] = last
+                if node is None:
+                    _index_prepend(self.index, other.nodes())
+        last.next = after
+        if node:
+            node.next = first
+        else:
+            self.head = first
+        if after is None:
+            self.tail = last
+        if self.index is not None and node and after:
+            _index_rebuild(self.index, self.nodes())
+        self.count += other.count
+        other._clear()
+
+    def split_at(self, node: Node) -> "SinglyLinkedList":
+        """
+        Detach every node after ``node`` into a new list and return it. The
+        nodes are relinked, not copied, but counting them costs O(k).
+        """
+        rest = type(self)(indexed=self.index is not None)
+        first = node.next
+        if first is None:
+            return rest
+        node.next = None
+        rest.head, rest.tail = first, self.tail
+        self.tail = node
+        prev = None
+        for current in rest.nodes():
+            if self.index is not None:
+                _index_remove(self.index, current)
+                _index_add(rest.index, current)
+                del self.predecessors[current]
+                rest.predecessors[current] = prev
+            rest.count += 1
+            prev = current
+        self.count -= rest.count
+        return rest
+
+    def rotate(self, k: int = 1) -> None:
+        """
+        Rotate the list ``k`` steps to the right (left if negative), like
+        ``deque.rotate``, by relinking the ends. Finding the new tail walks
+        O(n) nodes; nothing is allocated unless the list is indexed, in which
+        case it is reindexed in list order.
+        """
+        if self.count < 2 or k % self.count == 0:
+            return
+        new_tail = self.head
+        for _ in range(self.count - k % self.count - 1):
+            new_tail = new_tail.next
+        new_head = new_tail.next
+        self.tail.next = self.head
+        new_tail.next = None
+        if self.predecessors is not None:
+            self.predecessors[self.head] = self.tail
+            self.predecessors[new_head] = None
+        self.head, self.tail = new_head, new_tail
+        if self.index is not None:
+            _index_rebuild(self.index, self.nodes())
+
+    def _check(self) -> None:
+        """
+        Verify the list's invariants in one pass, raising ``AssertionError``
+        on the first violation: the count matches the nodes reachable from
+        the head, the tail is the last of them, and indexed lists map exactly
+        those nodes, in list order (and their predecessors). Meant for tests
+        and debugging.
+        """
+        seen = 0
+        prev = None
+        current = self.head
+        buckets = {}
+        while current:
+            seen += 1
+            if seen > self.count:
+                raise AssertionError("More nodes than count (or a cycle)")
+            if self.index is not None:
+                bucket = buckets.get(current.value)
+                if bucket is None:
+                    bucket = buckets[current.value] = iter(
+                        self.index.get(current.value, ())
+                    )
+                if next(bucket, None) is not current:
+                    raise AssertionError(
+                        f"Node {current.value!r} missing from index or out of order"
+                    )
+                if self.predecessors.get(current, current) is not prev:
+                    raise AssertionError(f"Wrong predecessor for {current.value!r}")
+            prev = current
+            current = current.next
+        if seen != self.count:
+            raise AssertionError(f"count is {self.count} but found {seen} nodes")
+        if self.tail is not prev:
+            raise AssertionError("tail is not the last node")
+        if self.index is not None:
+            if sum(len(nodes) for nodes in self.index.values()) != seen:
+                raise AssertionError("index holds nodes that are not in the list")
+            if len(self.predecessors) != seen:
+                raise AssertionError("predecessors hold nodes not in the list")
+
+    def _clear(self) -> None:
+        """
+        Forget every node, e.g. after they have been moved to another list.
+        """
+        self.head = self.tail = None
+        self.count = 0
+        if self.index is not None:
+            self.index.clear()
+            self.predecessors.clear()
+
+    def _unlink(self, node: Node, prev: Node) -> None:
+        """
+        Remove ``node``, whose predecessor is ``prev``, from the list.
+        """
+        if prev:
+            prev.next = node.next
+        else:
+            self.head = node.next
+        if node is self.tail:
+            self.tail = prev
+        if self.index is not None:
+            _index_remove(self.index, node)
+            del self.predecessors[node]
+            if node.next:
+                self.predecessors[node.next] = prev
+        node.next = None
+        self.count -= 1
+
 
 class DoubleNode:
+    __slots__ = ("value", "next", "prev")
+
     def __init__(self, value: int, next_node=None, prev_node=None):
         """
         Initialize a double node with value, next, and previous.
@@ -208,13 +920,23 @@ class DoubleNode:
 
 
 class DoublyLinkedList:
-    def __init__(self):
+    def __init__(self, indexed: bool = False):
         """
         Initialize an empty doubly linked list.
+
+        With ``indexed`` the list keeps a map from each value to the nodes
+        holding it, so ``find`` and ``delete`` run in O(1) on average. Values
+        must then be hashable. Each value's nodes are kept in list order, so
+        ``find`` and ``delete`` act on the first node with the value, as on
+        an unindexed list.
         """
         self.head = None
         self.tail = None
-        self.size = 0
+        self.count = 0
+        self.index = {} if indexed else None
+
+    def __len__(self) -> int:
+        return self.count
 
     def append(self, value: int) -> None:
         """
@@ -227,13 +949,15 @@ class DoublyLinkedList:
         else:
             self.head = new_node
         self.tail = new_node
-        self.size += 1
+        if self.index is not None:
+            _index_add(self.index, new_node)
+        self.count += 1
 
     def insert(self, position: int, value: int) -> None:
         """
         Insert a node with a value at a particular position.
         """
-        if position < 0 or position > self.size:
+        if position < 0 or position > self.count:
             raise IndexError("Index out of bounds")
 
         new_node = DoubleNode(value)
@@ -245,9 +969,7 @@ class DoublyLinkedList:
             if not self.tail:
                 self.tail = new_node
         else:
-            current = self.head
-            for _ in range(position - 1):
-                current = current.next
+            current = self._node_at(position - 1)
             new_node.next = current.next
             if current.next:
                 current.next.prev = new_node
@@ -255,31 +977,79 @@ class DoublyLinkedList:
             new_node.prev = current
             if new_node.next is None:
                 self.tail = new_node
-        self.size += 1
+        if self.index is not None:
+            nodes = self.index.get(value)
+            if new_node is self.tail or not nodes:
+                _index_add(self.index, new_node)
+            else:
+                if position <= self.count // 2:
+                    rank = _index_rank(self.head, new_node, nodes, "next")
+                else:
+                    rank = len(nodes) - _index_rank(self.tail, new_node, nodes, "prev")
+                _index_insert(self.index, new_node, rank)
+        self.count += 1
+
+    def get(self, position: int) -> int:
+        """
+        Returns the value at a particular position.
+        """
+        if position < 0 or position >= self.count:
+            raise IndexError("Index out of bounds")
+        return self._node_at(position).value
 
     def delete(self, value: int) -> None:
         """
         Delete the first node with a specific value.
         """
-        current = self.head
-        while current:
-            if current.value == value:
-                if current.prev:
-                    current.prev.next = current.next
-                else:
-                    self.head = current.next
-                if current.next:
-                    current.next.prev = current.prev
-                else:
-                    self.tail = current.prev
-                self.size -= 1
-                return
-            current = current.next
+        node = self.find(value)
+        if node:
+            self.delete_node(node)
+
+    def delete_at(self, position: int) -> int:
+        """
+        Delete the node at a particular position and return its value.
+        """
+        if position < 0 or position >= self.count:
+            raise IndexError("Index out of bounds")
+        node = self._node_at(position)
+        self.delete_node(node)
+        return node.value
+
+    def delete_node(self, node: DoubleNode) -> None:
+        """
+        Unlink a node that belongs to this list in O(1). Raises
+        ``ValueError`` for a node known not to be in the list: any node
+        outside an indexed list, and a detached node otherwise. A node linked
+        into another unindexed list cannot be told apart in O(1).
+        """
+        if self.index is not None:
+            if node not in self.index.get(node.value, ()):
+                raise ValueError("Node is not in the list")
+        elif (node.prev is None and node is not self.head) or (
+            node.next is None and node is not self.tail
+        ):
+            raise ValueError("Node is not in the list")
+        if node.prev:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        if node.next:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        node.prev = node.next = None
+        if self.index is not None:
+            _index_remove(self.index, node)
+        self.count -= 1
 
     def find(self, value: int) -> DoubleNode:
         """
         Find a node with a specific value.
         """
+        if self.index is not None:
+            nodes = self.index.get(value)
+            return next(iter(nodes)) if nodes else None
+
         current = self.head
         while current:
             if current.value == value:
@@ -291,23 +1061,64 @@ class DoublyLinkedList:
         """
         Returns the number of elements in the linked list.
         """
-        return self.size
+        return self.count
 
     def is_empty(self) -> bool:
         """
         Checks if the linked list is empty.
         """
-        return self.size == 0
+        return self.count == 0
 
-    def print_list(self) -> None:
+    def __iter__(self) -> Iterator[int]:
+        return self.values()
+
+    def values(self) -> Generator[int, None, None]:
         """
-        Prints all elements in the linked list.
+        Lazily yield the values from head to tail.
+        """
+        current = self.head
+        while current:
+            yield current.value
+            current = current.next
+
+    def nodes(self) -> Generator[DoubleNode, None, None]:
+        """
+        Lazily yield the nodes from head to tail.
         """
         current = self.head
         while current:
-            print(current.value, end=" <-> ")
+            yield current
+            current = current.next
+
+    def to_list(self) -> List[int]:
+        """
+        Returns the values as a list.
+        """
+        values = [None] * self.count
+        current = self.head
+        for i in range(self.count):
+            values[i] = current.value
             current = current.next
-        print("None")
+        return values
+
+    def write_to(self, stream: TextIO, chunk_size: int = 4096) -> None:
+        """
+        Write the list as ``1 <-> 2 <-> None`` followed by a newline, joining
+        ``chunk_size`` values per ``write`` call.
+        """
+        _write_values(stream, self.values(), " <-> ", chunk_size)
+
+    def print_list(self) -> None:
+        """
+        Prints all elements in the linked list.
+        """
+        self.write_to(sys.stdout)
+
+    def __reversed__(self) -> Generator[int, None, None]:
+        current = self.tail
+        while current:
+            yield current.value
+            current = current.prev
 
     def reverse(self) -> None:
         """
@@ -318,6 +1129,8 @@ class DoublyLinkedList:
             current.prev, current.next = current.next, current.prev
             current = current.prev
         self.head, self.tail = self.tail, self.head
+        if self.index is not None:
+            _index_reverse(self.index)
 
     def get_head(self) -> DoubleNode:
         """
@@ -331,139 +1144,1596 @@ class DoublyLinkedList:
         """
         return self.tail
 
-
-class Queue:
-    def __init__(self):
+    def concat(self, other: "DoublyLinkedList") -> None:
         """
-        Initialize an empty queue.
+        Move every node of ``other`` to the end of this list, leaving
+        ``other`` empty. O(1) unless this list is indexed, in which case the
+        moved nodes are indexed in O(len(other)).
         """
-        self.queue = []
+        self.splice(self.tail, other)
 
-    def enqueue(self, value: int) -> None:
+    def splice(self, node: DoubleNode, other: "DoublyLinkedList") -> None:
         """
-        Add a value to the end of the queue.
+        Move every node of ``other`` in after ``node`` (or to the front when
+        ``node`` is None), leaving ``other`` empty. Costs O(1), plus indexing
+        the moved nodes on indexed lists, which reindexes the whole list when
+        they land between two nodes.
         """
-        self.queue.append(value)
+        if other is self:
+            raise ValueError("Cannot splice a list into itself")
+        if other.head is None:
+            return
+        first, last = other.head, other.tail
+        after = node.next if node else self.head
+        if self.index is not None:
+            if after is None:
+                for current in other.nodes():
+                    _index_add(self.index, current)
+            elif node is None:
+                _index_prepend(self.index, other.nodes())
+        first.prev = node
+        last.next = after
+        if node:
+            node.next = first
+        else:
+            self.head = first
+        if after:
+            after.prev = last
+        else:
+            self.tail = last
+        if self.index is not None and node and after:
+            _index_rebuild(self.index, self.nodes())
+        self.count += other.count
+        other._clear()
 
-    def dequeue(self) -> int:
+    def split_at(self, node: DoubleNode) -> "DoublyLinkedList":
         """
-        Remove a value from the front of the queue and return it.
+        Detach every node after ``node`` into a new list and return it. The
+        nodes are relinked, not copied, but counting them costs O(k).
         """
-        if self.queue:
-            return self.queue.pop(0)
-        else:
-            raise IndexError("Dequeue from empty queue")
+        rest = type(self)(indexed=self.index is not None)
+        first = node.next
+        if first is None:
+            return rest
+        node.next = first.prev = None
+        rest.head, rest.tail = first, self.tail
+        self.tail = node
+        for current in rest.nodes():
+            if self.index is not None:
+                _index_remove(self.index, current)
+                _index_add(rest.index, current)
+            rest.count += 1
+        self.count -= rest.count
+        return rest
 
-    def peek(self) -> int:
+    def rotate(self, k: int = 1) -> None:
         """
-        Peek at the value at the front of the queue without removing it.
+        Rotate the list ``k`` steps to the right (left if negative), like
+        ``deque.rotate``, by relinking the ends. The new tail is found by
+        walking from the nearer end; nothing is allocated unless the list is
+        indexed, in which case it is reindexed in list order.
         """
-        if self.queue:
-            return self.queue[0]
-        else:
-            raise IndexError("Peek from empty queue")
+        if self.count < 2 or k % self.count == 0:
+            return
+        new_tail = self._node_at(self.count - k % self.count - 1)
+        new_head = new_tail.next
+        self.tail.next = self.head
+        self.head.prev = self.tail
+        new_tail.next = new_head.prev = None
+        self.head, self.tail = new_head, new_tail
+        if self.index is not None:
+            _index_rebuild(self.index, self.nodes())
 
-    def is_empty(self) -> bool:
+    def _node_at(self, position: int) -> DoubleNode:
         """
-        Check if the queue is empty.
+        Find the node at a valid position, walking from whichever end is
+        closer.
         """
-        return len(self.queue) == 0
+        if position < self.count // 2:
+            current = self.head
+            for _ in range(position):
+                current = current.next
+        else:
+            current = self.tail
+            for _ in range(self.count - 1 - position):
+                current = current.prev
+        return current
+
+    def _clear(self) -> None:
+        """
+        Forget every node, e.g. after they have been moved to another list.
+        """
+        self.head = self.tail = None
+        self.count = 0
+        if self.index is not None:
+            self.index.clear()
+
+    def _check(self) -> None:
+        """
+        Verify the list's invariants in one pass, raising ``AssertionError``
+        on the first violation: every ``prev`` mirrors the ``next`` before
+        it, the count matches the nodes reachable from the head, the tail is
+        the last of them, and indexed lists map exactly those nodes, in list
+        order. Meant for tests and debugging.
+        """
+        seen = 0
+        prev = None
+        current = self.head
+        buckets = {}
+        while current:
+            seen += 1
+            if seen > self.count:
+                raise AssertionError("More nodes than count (or a cycle)")
+            if current.prev is not prev:
+                raise AssertionError(f"Broken prev link at {current.value!r}")
+            if self.index is not None:
+                bucket = buckets.get(current.value)
+                if bucket is None:
+                    bucket = buckets[current.value] = iter(
+                        self.index.get(current.value, ())
+                    )
+                if next(bucket, None) is not current:
+                    raise AssertionError(
+                        f"Node {current.value!r} missing from index or out of order"
+                    )
+            prev = current
+            current = current.next
+        if seen != self.count:
+            raise AssertionError(f"count is {self.count} but found {seen} nodes")
+        if self.tail is not prev:
+            raise AssertionError("tail is not the last node")
+        if self.index is not None and (
+            sum(len(nodes) for nodes in self.index.values()) != seen
+        ):
+            raise AssertionError("index holds nodes that are not in the list")
+
+
+class ArrayLinkedList:
+    def __init__(self, typecode: str = None, capacity: int = 0):
+        """
+        Initialize an empty doubly linked list stored as parallel arrays.
+
+        Instead of one Python object per node, slot ``i`` of ``data``,
+        ``next`` and ``prev`` together form a node, and links are slot
+        numbers (-1 for none) held in ``array("q")`` buffers. Freed slots are
+        chained through ``next`` for reuse. With an ``array`` module
+        ``typecode`` the values are stored unboxed too. Nodes are addressed
+        by slot number wherever the other lists use node objects.
+        """
+        self.typecode = typecode
+        self.data = _allocate(0, typecode)
+        self.filler = _allocate(1, typecode)[0]
+        self.next = array("q")
+        self.prev = array("q")
+        self.head = -1
+        self.tail = -1
+        self.free = -1
+        self.count = 0
+        if capacity:
+            self._grow(capacity)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[int]:
+        return self.values()
+
+    def values(self) -> Generator[int, None, None]:
+        """
+        Lazily yield the values from head to tail.
+        """
+        slot = self.head
+        while slot != -1:
+            yield self.data[slot]
+            slot = self.next[slot]
+
+    def to_list(self) -> List[int]:
+        """
+        Returns the values as a list.
+        """
+        values = [None] * self.count
+        slot = self.head
+        for i in range(self.count):
+            values[i] = self.data[slot]
+            slot = self.next[slot]
+        return values
+
+    def append(self, value: int) -> int:
+        """
+        Add a value to the end of the list and return its slot.
+        """
+        slot = self._allocate_slot(value)
+        self._link_after(self.tail, slot)
+        return slot
+
+    def insert(self, position: int, value: int) -> int:
+        """
+        Insert a value at a particular position and return its slot.
+        """
+        if position < 0 or position > self.count:
+            raise IndexError("Index out of bounds")
+        before = self._slot_at(position - 1) if position else -1
+        slot = self._allocate_slot(value)
+        self._link_after(before, slot)
+        return slot
+
+    def value_at(self, slot: int) -> int:
+        """
+        Returns the value stored in a slot that holds a node.
+        """
+        self._check_slot(slot)
+        return self.data[slot]
+
+    def find(self, value: int) -> int:
+        """
+        Find the slot of the first node with a specific value, or -1.
+        """
+        slot = self.head
+        while slot != -1:
+            if self.data[slot] == value:
+                return slot
+            slot = self.next[slot]
+        return -1
+
+    def delete(self, value: int) -> None:
+        """
+        Delete the first node with a specific value.
+        """
+        slot = self.find(value)
+        if slot != -1:
+            self.delete_slot(slot)
+
+    def delete_slot(self, slot: int) -> None:
+        """
+        Unlink the node in a slot in O(1) and put the slot on the free list.
+        """
+        self._check_slot(slot)
+        before, after = self.prev[slot], self.next[slot]
+        if before != -1:
+            self.next[before] = after
+        else:
+            self.head = after
+        if after != -1:
+            self.prev[after] = before
+        else:
+            self.tail = before
+        self.data[slot] = self.filler
+        self.prev[slot] = -1
+        self.next[slot] = self.free
+        self.free = slot
+        self.count -= 1
+
+    def size(self) -> int:
+        """
+        Returns the number of elements in the linked list.
+        """
+        return self.count
+
+    def is_empty(self) -> bool:
+        """
+        Checks if the linked list is empty.
+        """
+        return self.count == 0
+
+    def get_head(self) -> int:
+        """
+        Returns the slot of the head node, or -1.
+        """
+        return self.head
+
+    def get_tail(self) -> int:
+        """
+        Returns the slot of the tail node, or -1.
+        """
+        return self.tail
+
+    def _check_slot(self, slot: int) -> None:
+        """
+        Raise ``IndexError`` unless a slot holds a node. Only the head and
+        free slots have no ``prev`` link.
+        """
+        if not 0 <= slot < len(self.next) or (
+            self.prev[slot] == -1 and slot != self.head
+        ):
+            raise IndexError("Slot is not in use")
+
+    def _slot_at(self, position: int) -> int:
+        """
+        Find the slot at a valid position, walking from the nearer end.
+        """
+        if position < self.count // 2:
+            slot = self.head
+            for _ in range(position):
+                slot = self.next[slot]
+        else:
+            slot = self.tail
+            for _ in range(self.count - 1 - position):
+                slot = self.prev[slot]
+        return slot
+
+    def _allocate_slot(self, value: int) -> int:
+        """
+        Take a slot from the free list, growing the arrays if it is empty.
+        """
+        if self.free == -1:
+            self._grow(max(8, 2 * len(self.next)))
+        slot = self.free
+        self.free = self.next[slot]
+        self.data[slot] = value
+        return slot
+
+    def _link_after(self, before: int, slot: int) -> None:
+        """
+        Link a slot in after ``before`` (-1 links it in as the head).
+        """
+        after = self.next[before] if before != -1 else self.head
+        self.prev[slot] = before
+        self.next[slot] = after
+        if before != -1:
+            self.next[before] = slot
+        else:
+            self.head = slot
+        if after != -1:
+            self.prev[after] = slot
+        else:
+            self.tail = slot
+        self.count += 1
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Extend the arrays to ``capacity`` slots and chain the new slots onto
+        the (empty) free list.
+        """
+        old = len(self.next)
+        self.data.extend(_allocate(capacity - old, self.typecode))
+        self.next.extend(array("q", range(old + 1, capacity)))
+        self.next.append(self.free)
+        self.prev.extend(array("q", [-1]) * (capacity - old))
+        self.free = old
+
+
+# Upper bound on skip list levels; enough for 2**32 elements at p = 1/2.
+_SKIP_MAX_LEVEL = 32
+
+
+class SkipNode:
+    __slots__ = ("value", "prev", "links", "widths")
+
+    def __init__(self, value: int, level: int):
+        """
+        Initialize a skip list node with forward links on ``level`` levels.
+
+        ``widths[i]`` is how many positions ``links[i]`` is ahead of this
+        node (counting the end of the list as one past the last node). Level 0
+        is an ordinary doubly linked list, exposed as ``next``/``prev``.
+        """
+        self.value = value
+        self.prev = None
+        self.links = [None] * level
+        self.widths = [1] * level
+
+    @property
+    def next(self) -> "SkipNode":
+        return self.links[0]
+
+
+class IndexableSkipList:
+    def __init__(self, values: Iterable[int] = ()):
+        """
+        Initialize a positional sequence stored as an indexable skip list.
+
+        ``get``, ``insert`` and ``delete_at`` run in O(log n) expected time.
+        Nodes still form a doubly linked list reachable through
+        ``get_head``/``get_tail`` and ``next``/``prev``.
+        """
+        self.header = SkipNode(None, _SKIP_MAX_LEVEL)
+        self.tail = None
+        self.level = 1
+        self.count = 0
+        self.random = random.Random()
+        for value in values:
+            self.append(value)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[int]:
+        current = self.header.links[0]
+        while current:
+            yield current.value
+            current = current.links[0]
+
+    def append(self, value: int) -> None:
+        """
+        Add a value to the end of the list.
+        """
+        self.insert(self.count, value)
+
+    def insert(self, position: int, value: int) -> None:
+        """
+        Insert a value at a particular position.
+        """
+        if position < 0 or position > self.count:
+            raise IndexError("Index out of bounds")
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                self.header.links[i] = None
+                self.header.widths[i] = self.count + 1
+            self.level = level
+
+        update, positions = self._predecessors(position)
+        node = SkipNode(value, level)
+        for i in range(self.level):
+            before = update[i]
+            if i < level:
+                node.links[i] = before.links[i]
+                node.widths[i] = positions[i] + before.widths[i] + 1 - position
+                before.links[i] = node
+                before.widths[i] = position - positions[i]
+            else:
+                before.widths[i] += 1
+
+        if update[0] is not self.header:
+            node.prev = update[0]
+        if node.links[0]:
+            node.links[0].prev = node
+        else:
+            self.tail = node
+        self.count += 1
+
+    def get(self, position: int) -> int:
+        """
+        Returns the value at a particular position.
+        """
+        return self.get_node(position).value
+
+    def get_node(self, position: int) -> SkipNode:
+        """
+        Returns the node at a particular position.
+        """
+        if position < 0 or position >= self.count:
+            raise IndexError("Index out of bounds")
+        current = self.header
+        reached = -1
+        for i in range(self.level - 1, -1, -1):
+            while current.links[i] and reached + current.widths[i] <= position:
+                reached += current.widths[i]
+                current = current.links[i]
+        return current
+
+    def delete_at(self, position: int) -> int:
+        """
+        Delete the value at a particular position and return it.
+        """
+        if position < 0 or position >= self.count:
+            raise IndexError("Index out of bounds")
+        update, _ = self._predecessors(position)
+        node = update[0].links[0]
+        for i in range(self.level):
+            before = update[i]
+            if before.links[i] is node:
+                before.links[i] = node.links[i]
+                before.widths[i] += node.widths[i] - 1
+            else:
+                before.widths[i] -= 1
+
+        if node.links[0]:
+            node.links[0].prev = node.prev
+        else:
+            self.tail = node.prev
+        while self.level > 1 and self.header.links[self.level - 1] is None:
+            self.level -= 1
+        self.count -= 1
+        return node.value
+
+    def find(self, value: int) -> SkipNode:
+        """
+        Find a node with a specific value.
+        """
+        current = self.header.links[0]
+        while current:
+            if current.value == value:
+                return current
+            current = current.links[0]
+        return None
+
+    def delete(self, value: int) -> None:
+        """
+        Delete the first node with a specific value.
+        """
+        position = 0
+        current = self.header.links[0]
+        while current:
+            if current.value == value:
+                self.delete_at(position)
+                return
+            position += 1
+            current = current.links[0]
+
+    def size(self) -> int:
+        """
+        Returns the number of elements in the list.
+        """
+        return self.count
+
+    def is_empty(self) -> bool:
+        """
+        Checks if the list is empty.
+        """
+        return self.count == 0
+
+    def get_head(self) -> SkipNode:
+        """
+        Returns the head node of the list.
+        """
+        return self.header.links[0]
+
+    def get_tail(self) -> SkipNode:
+        """
+        Returns the tail node of the list.
+        """
+        return self.tail
+
+    def _predecessors(self, position: int) -> Tuple[List[SkipNode], List[int]]:
+        """
+        For every level, the last node before ``position`` and its position
+        (-1 for the header).
+        """
+        update = [None] * self.level
+        positions = [0] * self.level
+        current = self.header
+        reached = -1
+        for i in range(self.level - 1, -1, -1):
+            while current.links[i] and reached + current.widths[i] < position:
+                reached += current.widths[i]
+                current = current.links[i]
+            update[i] = current
+            positions[i] = reached
+        return update, positions
+
+    def _random_level(self) -> int:
+        """
+        Draw a node level from a geometric distribution with p = 1/2.
+        """
+        level = 1
+        while level < _SKIP_MAX_LEVEL and self.random.random() < 0.5:
+            level += 1
+        return level
+
+
+_MISSING = object()
+
+
+class _CacheNode(DoubleNode):
+    __slots__ = ("key", "expires_at", "nbytes", "frequency", "bucket")
+
+    def __init__(self, key: Any, value: Any, expires_at: float, nbytes: int):
+        """
+        Initialize a cache entry: a double node that also remembers its key,
+        expiry time, size in bytes and access frequency.
+        """
+        super().__init__(value)
+        self.key = key
+        self.expires_at = expires_at
+        self.nbytes = nbytes
+        self.frequency = 1
+        self.bucket = None
+
+
+def _ring() -> DoubleNode:
+    """
+    Create the sentinel of an empty circular doubly linked list.
+    """
+    sentinel = DoubleNode(None)
+    sentinel.next = sentinel.prev = sentinel
+    return sentinel
+
+
+def _ring_push(sentinel: DoubleNode, node: DoubleNode) -> None:
+    """
+    Link a node in just before the sentinel, i.e. at the tail of the ring.
+    """
+    node.prev = sentinel.prev
+    node.next = sentinel
+    sentinel.prev.next = node
+    sentinel.prev = node
+
+
+def _ring_unlink(node: DoubleNode) -> None:
+    """
+    Unlink a node from the ring it belongs to.
+    """
+    node.prev.next = node.next
+    node.next.prev = node.prev
+    node.prev = node.next = None
+
+
+class _Cache(ABC):
+    def __init__(
+        self,
+        capacity: int,
+        max_bytes: int = None,
+        ttl: float = None,
+        on_evict: Callable[[Any, Any], None] = None,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Shared bookkeeping for the caches: the key -> node map, expiry, size
+        accounting and counters. Subclasses decide the eviction order.
+
+        ``max_bytes`` bounds the total ``sizeof`` of the cached values. ``ttl``
+        is the default lifetime of an entry in seconds; expired entries are
+        dropped lazily when they are next looked up or reach the front of the
+        eviction order. ``on_evict(key, value)`` is called for every entry the
+        cache drops by itself, but not for ``pop`` or overwrites.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.sizeof = sizeof
+        self.clock = clock
+        self.map = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self.map)
+
+    def __contains__(self, key: Any) -> bool:
+        return self._lookup(key) is not None
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        Return the value for a key, marking it as used, or ``default``.
+        """
+        node = self._lookup(key)
+        if node is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._touch(node)
+        return node.value
+
+    def peek(self, key: Any, default: Any = None) -> Any:
+        """
+        Return the value for a key without marking it as used or counting a
+        hit or miss.
+        """
+        node = self._lookup(key)
+        return default if node is None else node.value
+
+    def put(self, key: Any, value: Any, ttl: float = None) -> None:
+        """
+        Insert or replace a value, evicting entries as needed to stay within
+        ``capacity`` and ``max_bytes``.
+        """
+        nbytes = self.sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            raise ValueError("Value is larger than max_bytes")
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self.clock() + ttl if ttl is not None else None
+
+        node = self.map.get(key)
+        if node is not None:
+            self.nbytes += nbytes - node.nbytes
+            node.value = value
+            node.nbytes = nbytes
+            node.expires_at = expires_at
+            self._touch(node)
+        else:
+            node = _CacheNode(key, value, expires_at, nbytes)
+            self.map[key] = node
+            self.nbytes += nbytes
+            self._link(node)
+
+        while len(self.map) > self.capacity or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        ):
+            victim = self._victim(keep=node)
+            if self._expired(victim):
+                self.expirations += 1
+            else:
+                self.evictions += 1
+            self._drop(victim, notify=True)
+
+    def pop(self, key: Any, default: Any = _MISSING) -> Any:
+        """
+        Remove a key and return its value. Raises ``KeyError`` for a missing
+        key unless a default is given.
+        """
+        node = self._lookup(key)
+        if node is None:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        self._drop(node, notify=False)
+        return node.value
+
+    def clear(self) -> None:
+        """
+        Remove every entry without calling ``on_evict``.
+        """
+        for node in list(self.map.values()):
+            self._drop(node, notify=False)
+
+    @abstractmethod
+    def _link(self, node: "_CacheNode") -> None:
+        """
+        Add a new entry to the eviction order.
+        """
+
+    @abstractmethod
+    def _touch(self, node: "_CacheNode") -> None:
+        """
+        Record a use of an entry.
+        """
+
+    @abstractmethod
+    def _unlink(self, node: "_CacheNode") -> None:
+        """
+        Remove an entry from the eviction order.
+        """
+
+    @abstractmethod
+    def _victim(self, keep: "_CacheNode") -> "_CacheNode":
+        """
+        The entry to evict next, other than ``keep``.
+        """
+
+    def _lookup(self, key: Any) -> "_CacheNode":
+        """
+        Find a live entry, dropping it instead if it has expired.
+        """
+        node = self.map.get(key)
+        if node is not None and self._expired(node):
+            self.expirations += 1
+            self._drop(node, notify=True)
+            return None
+        return node
+
+    def _expired(self, node: "_CacheNode") -> bool:
+        return node.expires_at is not None and node.expires_at <= self.clock()
+
+    def _drop(self, node: "_CacheNode", notify: bool) -> None:
+        """
+        Remove an entry from the map and the eviction order.
+        """
+        del self.map[node.key]
+        self.nbytes -= node.nbytes
+        self._unlink(node)
+        if notify and self.on_evict is not None:
+            self.on_evict(node.key, node.value)
+
+
+class LRUCache(_Cache):
+    def __init__(self, capacity: int, max_bytes: int = None, **options):
+        """
+        Initialize a least-recently-used cache. Every operation is O(1): the
+        entries sit on a circular doubly linked list in recency order, with a
+        dict from key to node. See ``_Cache`` for the shared options.
+        """
+        super().__init__(capacity, max_bytes=max_bytes, **options)
+        self.order = _ring()
+
+    def _link(self, node: _CacheNode) -> None:
+        _ring_push(self.order, node)
+
+    def _touch(self, node: _CacheNode) -> None:
+        _ring_unlink(node)
+        _ring_push(self.order, node)
+
+    def _unlink(self, node: _CacheNode) -> None:
+        _ring_unlink(node)
+
+    def _victim(self, keep: _CacheNode) -> _CacheNode:
+        victim = self.order.next
+        return victim.next if victim is keep else victim
+
+
+class _FrequencyBucket(DoubleNode):
+    __slots__ = ("items",)
+
+    def __init__(self, frequency: int):
+        """
+        Initialize a bucket holding, in recency order, every LFU entry that
+        has been used ``frequency`` times.
+        """
+        super().__init__(frequency)
+        self.items = _ring()
+
+
+class LFUCache(_Cache):
+    def __init__(self, capacity: int, max_bytes: int = None, **options):
+        """
+        Initialize a least-frequently-used cache, breaking ties by recency.
+
+        Entries live in frequency buckets, and the buckets themselves form a
+        linked list in increasing frequency, so finding the victim and
+        bumping an entry's frequency are both O(1). See ``_Cache`` for the
+        shared options.
+        """
+        super().__init__(capacity, max_bytes=max_bytes, **options)
+        self.buckets = _ring()
+
+    def _link(self, node: _CacheNode) -> None:
+        node.frequency = 1
+        first = self.buckets.next
+        if first is self.buckets or first.value != 1:
+            first = self._add_bucket(1, self.buckets)
+        node.bucket = first
+        _ring_push(first.items, node)
+
+    def _touch(self, node: _CacheNode) -> None:
+        bucket = node.bucket
+        node.frequency += 1
+        following = bucket.next
+        if following is self.buckets or following.value != node.frequency:
+            following = self._add_bucket(node.frequency, bucket)
+        self._unlink(node)
+        node.bucket = following
+        _ring_push(following.items, node)
+
+    def _unlink(self, node: _CacheNode) -> None:
+        bucket = node.bucket
+        _ring_unlink(node)
+        if bucket.items.next is bucket.items:
+            _ring_unlink(bucket)
+
+    def _victim(self, keep: _CacheNode) -> _CacheNode:
+        bucket = self.buckets.next
+        victim = bucket.items.next
+        if victim is not keep:
+            return victim
+        if victim.next is not bucket.items:
+            return victim.next
+        return bucket.next.items.next
+
+    def _add_bucket(self, frequency: int, after: DoubleNode) -> _FrequencyBucket:
+        """
+        Create a bucket for ``frequency`` and link it in after ``after``.
+        """
+        bucket = _FrequencyBucket(frequency)
+        bucket.prev = after
+        bucket.next = after.next
+        after.next.prev = bucket
+        after.next = bucket
+        return bucket
+
+
+class Queue:
+    def __init__(self, capacity: int = 8, shrink: bool = True):
+        """
+        Initialize an empty queue backed by a circular buffer.
+
+        The capacity is rounded up to a power of two so that wrap-around is a
+        bit mask. When ``shrink`` is set the buffer halves once it drops to a
+        quarter full, but never below the initial capacity.
+        """
+        self.capacity = self._round_capacity(capacity)
+        self.min_capacity = self.capacity
+        self.shrink = shrink
+        self.queue = [None] * self.capacity
+        self.head = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def enqueue(self, value: int) -> None:
+        """
+        Add a value to the end of the queue.
+        """
+        if self.count == self.capacity:
+            self._resize(self.capacity << 1)
+        self.queue[(self.head + self.count) & (self.capacity - 1)] = value
+        self.count += 1
+
+    def enqueue_many(self, values: Iterable[int]) -> None:
+        """
+        Add every value from an iterable to the end of the queue.
+
+        The values are copied into the buffer with at most two slice
+        assignments instead of one enqueue per value.
+        """
+        values = list(values)
+        k = len(values)
+        if k == 0:
+            return
+        if self.count + k > self.capacity:
+            self._resize(self._round_capacity(self.count + k))
+        tail = (self.head + self.count) & (self.capacity - 1)
+        first = min(k, self.capacity - tail)
+        self.queue[tail:tail + first] = values[:first]
+        if first < k:
+            self.queue[:k - first] = values[first:]
+        self.count += k
+
+    def dequeue(self) -> int:
+        """
+        Remove a value from the front of the queue and return it.
+        """
+        if self.count == 0:
+            raise IndexError("Dequeue from empty queue")
+        value = self.queue[self.head]
+        self.queue[self.head] = None
+        self.head = (self.head + 1) & (self.capacity - 1)
+        self.count -= 1
+        self._maybe_shrink()
+        return value
+
+    def dequeue_many(self, n: int) -> List[int]:
+        """
+        Remove up to ``n`` values from the front of the queue and return them
+        in order.
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        k = min(n, self.count)
+        end = self.head + k
+        if end <= self.capacity:
+            values = self.queue[self.head:end]
+            self.queue[self.head:end] = [None] * k
+        else:
+            wrapped = end - self.capacity
+            values = self.queue[self.head:] + self.queue[:wrapped]
+            self.queue[self.head:] = [None] * (self.capacity - self.head)
+            self.queue[:wrapped] = [None] * wrapped
+        self.head = end & (self.capacity - 1)
+        self.count -= k
+        self._maybe_shrink()
+        return values
+
+    def peek(self) -> int:
+        """
+        Peek at the value at the front of the queue without removing it.
+        """
+        if self.count == 0:
+            raise IndexError("Peek from empty queue")
+        return self.queue[self.head]
+
+    def is_empty(self) -> bool:
+        """
+        Check if the queue is empty.
+        """
+        return self.count == 0
+
+    def _maybe_shrink(self) -> None:
+        """
+        Halve the buffer (repeatedly, after a bulk dequeue) while it is at most
+        a quarter full.
+        """
+        if not self.shrink:
+            return
+        capacity = self.capacity
+        while capacity > self.min_capacity and self.count <= capacity >> 2:
+            capacity >>= 1
+        if capacity != self.capacity:
+            self._resize(capacity)
+
+    def _resize(self, capacity: int) -> None:
+        """
+        Move the live values into a new buffer of the given capacity,
+        unwrapping them so that the head starts at index 0.
+        """
+        end = self.head + self.count
+        if end <= self.capacity:
+            values = self.queue[self.head:end]
+        else:
+            values = self.queue[self.head:] + self.queue[:end - self.capacity]
+        self.queue = values + [None] * (capacity - self.count)
+        self.capacity = capacity
+        self.head = 0
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """
+        Round a requested capacity up to the next power of two.
+        """
+        return 1 << max(capacity - 1, 0).bit_length()
+
+
+def _wait_until(
+    condition: threading.Condition,
+    ready: Callable[[], bool],
+    block: bool,
+    timeout: float,
+    error: Exception,
+) -> None:
+    """
+    With ``condition`` held, wait until ``ready()`` is true, raising
+    ``error`` if not blocking or once ``timeout`` seconds have passed.
+    """
+    if not ready() and (not block or not condition.wait_for(ready, timeout)):
+        raise error
+
+
+class ThreadSafeQueue:
+    def __init__(self, maxsize: int = 0):
+        """
+        Initialize an empty queue that can be shared between threads.
+
+        Values are stored in a ``Queue`` guarded by one lock, with separate
+        conditions for waiting producers and consumers. When ``maxsize`` is
+        positive, ``put`` blocks (or raises ``queue.Full``) while the queue
+        holds that many values.
+        """
+        self.maxsize = maxsize
+        self.queue = Queue()
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.queue)
+
+    def put(self, value: int, block: bool = True, timeout: float = None) -> None:
+        """
+        Add a value to the end of the queue, waiting for room if it is full.
+        """
+        with self.not_full:
+            _wait_until(self.not_full, self._has_room, block, timeout, Full)
+            self.queue.enqueue(value)
+            self.not_empty.notify()
+
+    def get(self, block: bool = True, timeout: float = None) -> int:
+        """
+        Remove a value from the front of the queue and return it, waiting for
+        one if the queue is empty. Raises ``queue.Empty`` on timeout.
+        """
+        with self.not_empty:
+            _wait_until(self.not_empty, self._has_values, block, timeout, Empty)
+            value = self.queue.dequeue()
+            self.not_full.notify()
+            return value
+
+    def is_empty(self) -> bool:
+        """
+        Check if the queue is empty.
+        """
+        with self.lock:
+            return self.queue.is_empty()
+
+    def _has_room(self) -> bool:
+        return self.maxsize <= 0 or len(self.queue) < self.maxsize
+
+    def _has_values(self) -> bool:
+        return not self.queue.is_empty()
+
+
+class AsyncQueue:
+    def __init__(self, maxsize: int = 0):
+        """
+        Initialize an empty queue for asyncio tasks.
+
+        Values are stored in a ``Queue``; ``put`` and ``get`` are coroutines
+        that wait for room or values. When ``maxsize`` is positive, ``put``
+        waits while the queue holds that many values. Code between awaits
+        runs atomically on the event loop, so no lock is needed: waiting
+        tasks sleep on futures that ``put`` and ``get`` resolve.
+        """
+        self.maxsize = maxsize
+        self.queue = Queue()
+        self.getters = deque()
+        self.putters = deque()
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    async def put(self, value: int) -> None:
+        """
+        Add a value to the end of the queue, waiting for room if it is full.
+        """
+        while not self._has_room():
+            await self._wait(self.putters)
+        self.queue.enqueue(value)
+        self._wake(self.getters)
+
+    async def get(self) -> int:
+        """
+        Remove a value from the front of the queue and return it, waiting for
+        one if the queue is empty.
+        """
+        while self.queue.is_empty():
+            await self._wait(self.getters)
+        value = self.queue.dequeue()
+        self._wake(self.putters)
+        if not self.queue.is_empty():
+            self._wake(self.getters)
+        return value
+
+    async def get_batch(self, max_items: int, max_wait: float = None) -> List[int]:
+        """
+        Wait for at least one value, then keep collecting until ``max_items``
+        are available or ``max_wait`` seconds have passed since the call, and
+        return up to ``max_items`` values in order. Returns an empty list if
+        nothing arrives within ``max_wait``; with ``max_wait=None`` waits for
+        the first value and returns whatever is queued at that moment.
+
+        Values put while a batch is being collected may wake the collecting
+        task rather than another consumer, so they go to that batch.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if max_wait is None else loop.time() + max_wait
+        wanted = 1 if deadline is None else max_items
+        while len(self.queue) < wanted:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            if not await self._wait(self.getters, remaining):
+                break
+        values = self.queue.dequeue_many(max_items)
+        for _ in values:
+            self._wake(self.putters)
+        if not self.queue.is_empty():
+            self._wake(self.getters)
+        return values
+
+    def is_empty(self) -> bool:
+        """
+        Check if the queue is empty.
+        """
+        return self.queue.is_empty()
+
+    async def _wait(self, waiters: deque, timeout: float = None) -> bool:
+        """
+        Sleep until ``_wake`` resolves our future, or ``timeout`` seconds
+        pass. Returns whether we were woken.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._discard(waiters, waiter)
+            return False
+        except asyncio.CancelledError:
+            self._discard(waiters, waiter)
+            if waiter.done() and not waiter.cancelled():
+                # We were woken but will not act on it; pass the wakeup on.
+                self._wake(waiters)
+            raise
+
+    @staticmethod
+    def _wake(waiters: deque) -> None:
+        """
+        Resolve the oldest pending waiter, skipping any that were cancelled.
+        """
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    @staticmethod
+    def _discard(waiters: deque, waiter: asyncio.Future) -> None:
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _has_room(self) -> bool:
+        return self.maxsize <= 0 or len(self.queue) < self.maxsize
+
+
+class HeapNode:
+    __slots__ = ("value", "priority", "entry", "queue")
+
+    def __init__(self, value: Any, priority: Any):
+        """
+        Initialize a priority queue handle.
+
+        ``entry`` is the node's current ``[priority, seq, node]`` list in the
+        heap, or None once the node has left the queue. ``queue`` is the
+        queue the node was enqueued in.
+        """
+        self.value = value
+        self.priority = priority
+        self.entry = None
+        self.queue = None
+
+
+class PriorityQueue:
+    def __init__(self, values: Iterable[Any] = ()):
+        """
+        Initialize a min-priority queue backed by a binary array heap.
+
+        The heap holds ``[priority, seq, node]`` lists and is maintained with
+        ``heapq``, so sifting runs in C. ``seq`` is a counter that is never
+        reused: it breaks ties so equal priorities leave in FIFO order, and
+        it stops comparisons before they reach the node. Changing or removing
+        an entry only marks it dead (its node slot becomes None). Dead
+        entries are skipped when they reach the top and are purged once they
+        outnumber the live ones. Initial values are heapified in O(n) and
+        use themselves as their priority.
+        """
+        self.heap = []
+        self.counter = 0
+        self.count = 0
+        self.enqueue_many(values)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def enqueue(self, value: Any, priority: Any = None) -> HeapNode:
+        """
+        Add a value with the given priority (the value itself if omitted) and
+        return its handle. Lower priorities are dequeued first.
+        """
+        node = HeapNode(value, value if priority is None else priority)
+        heapq.heappush(self.heap, self._entry(node))
+        self.count += 1
+        return node
+
+    def enqueue_many(
+        self, values: Iterable[Any], key: Callable[[Any], Any] = None
+    ) -> List[HeapNode]:
+        """
+        Add every value from an iterable, with ``key(value)`` (or the value
+        itself) as its priority, and return their handles.
+
+        Small batches are pushed one by one. When k pushes (O(k log n)) would
+        cost more than heapifying the whole array, the batch is appended and
+        the heap is rebuilt bottom-up in O(n + k).
+        """
+        nodes = [
+            HeapNode(value, value if key is None else key(value)) for value in values
+        ]
+        entries = [self._entry(node) for node in nodes]
+        n, k = len(self.heap), len(entries)
+        if k * (n + k).bit_length() < n + k:
+            for entry in entries:
+                heapq.heappush(self.heap, entry)
+        else:
+            self.heap.extend(entries)
+            heapq.heapify(self.heap)
+        self.count += k
+        return nodes
+
+    def dequeue(self) -> Any:
+        """
+        Remove the value with the lowest priority and return it.
+        """
+        if self.count == 0:
+            raise IndexError("Dequeue from empty queue")
+        self._skip_dead()
+        node = heapq.heappop(self.heap)[2]
+        node.entry = None
+        self.count -= 1
+        return node.value
+
+    def peek(self) -> Any:
+        """
+        Peek at the value with the lowest priority without removing it.
+        """
+        if self.count == 0:
+            raise IndexError("Peek from empty queue")
+        self._skip_dead()
+        return self.heap[0][2].value
+
+    def push_pop(self, value: Any, priority: Any = None) -> Any:
+        """
+        Enqueue a value and then dequeue the lowest-priority value, with a
+        single sift. If the new value would come out first it is returned
+        without touching the heap.
+        """
+        if priority is None:
+            priority = value
+        if self.count == 0:
+            return value
+        self._skip_dead()
+        if priority < self.heap[0][0]:
+            return value
+        node = HeapNode(value, priority)
+        top = heapq.heapreplace(self.heap, self._entry(node))[2]
+        top.entry = None
+        return top.value
+
+    def update(self, node: HeapNode, priority: Any) -> None:
+        """
+        Change the priority of a queued value. Among equal priorities it
+        now ranks as if it had just been enqueued.
+        """
+        self._discard(node)
+        node.priority = priority
+        heapq.heappush(self.heap, self._entry(node))
+        self._maybe_compact()
+
+    def decrease_key(self, node: HeapNode, priority: Any) -> None:
+        """
+        Lower the priority of a queued value.
+        """
+        queued = node.queue is self and node.entry is not None
+        if queued and node.priority < priority:
+            raise ValueError("New priority is greater than the current priority")
+        self.update(node, priority)
+
+    def remove(self, node: HeapNode) -> Any:
+        """
+        Remove a queued value by its handle and return it.
+        """
+        self._discard(node)
+        self.count -= 1
+        self._maybe_compact()
+        return node.value
+
+    def is_empty(self) -> bool:
+        """
+        Check if the priority queue is empty.
+        """
+        return self.count == 0
+
+    def _entry(self, node: HeapNode) -> list:
+        entry = node.entry = [node.priority, self.counter, node]
+        node.queue = self
+        self.counter += 1
+        return entry
+
+    def _discard(self, node: HeapNode) -> None:
+        """
+        Mark a node's heap entry dead, leaving it in place for now.
+        """
+        entry = node.entry
+        if node.queue is not self or entry is None or entry[2] is not node:
+            raise ValueError("Handle is not in this queue")
+        entry[2] = None
+        node.entry = None
+
+    def _skip_dead(self) -> None:
+        heap = self.heap
+        while heap[0][2] is None:
+            heapq.heappop(heap)
+
+    def _maybe_compact(self) -> None:
+        """
+        Drop every dead entry and re-heapify the rest once dead entries
+        outnumber live ones.
+        """
+        if len(self.heap) <= 2 * self.count + 16:
+            return
+        self.heap = [entry for entry in self.heap if entry[2] is not None]
+        heapq.heapify(self.heap)
 
 
 class TreeNode:
+    __slots__ = ("value", "left", "right", "height", "size")
+
     def __init__(self, value: int):
         """
         Initialize a tree node with value.
+
+        ``height`` counts the levels and ``size`` the nodes in the subtree
+        rooted at this node, so a leaf has height 1 and size 1.
         """
         self.value = value
         self.left = None
         self.right = None
+        self.height = 1
+        self.size = 1
 
 
 class BinarySearchTree:
-    def __init__(self):
+    def __init__(self, balanced: str = None):
         """
         Initialize an empty binary search tree.
+
+        Pass ``balanced="avl"`` to rebalance the tree with AVL rotations after
+        every insert and delete, keeping all operations O(log n). By default
+        the tree is not rebalanced.
         """
+        if balanced not in (None, "avl"):
+            raise ValueError(f"Unsupported balancing scheme: {balanced!r}")
+        self.balanced = balanced
         self.root = None
 
+    @classmethod
+    def from_sorted(
+        cls, values: Iterable[int], balanced: str = None
+    ) -> "BinarySearchTree":
+        """
+        Build a perfectly balanced tree from values in ascending order in O(n).
+        """
+        values = list(values)
+        for i in range(1, len(values)):
+            if values[i] < values[i - 1]:
+                raise ValueError("Values are not sorted")
+        tree = cls(balanced=balanced)
+        tree.root = tree._build(values, 0, len(values))
+        return tree
+
+    @classmethod
+    def from_iterable(
+        cls, values: Iterable[int], balanced: str = None
+    ) -> "BinarySearchTree":
+        """
+        Build a perfectly balanced tree from values in any order.
+        """
+        return cls.from_sorted(sorted(values), balanced=balanced)
+
     def insert(self, value: int) -> None:
         """
         Insert a node with a specific value into the binary search tree.
         """
+        new_node = TreeNode(value)
+        if self.root is None:
+            self.root = new_node
+            return
 
-        def _insert(root, value):
-            if root is None:
-                return TreeNode(value)
-            if value < root.value:
-                root.left = _insert(root.left, value)
-            else:
-                root.right = _insert(root.right, value)
-            return root
+        path = []
+        current = self.root
+        while current:
+            path.append(current)
+            current = current.left if value < current.value else current.right
+        parent = path[-1]
+        if value < parent.value:
+            parent.left = new_node
+        else:
+            parent.right = new_node
+        self._retrace(path)
+
+    def bulk_insert(self, values: Iterable[int]) -> None:
+        """
+        Insert many values at once.
 
-        self.root = _insert(self.root, value)
+        Small batches are inserted one by one, median first and then the
+        midpoints of each half, so values landing in the same gap form a
+        balanced subtree rather than a chain. When the batch is large enough
+        that k insertions (O(k log n)) would cost more than rebuilding, the
+        batch is merged with the in-order values of the tree and the tree is
+        rebuilt perfectly balanced in O(n + k).
+        """
+        batch = sorted(values)
+        n, k = self.size(), len(batch)
+        if k * (n + k).bit_length() < n + k:
+            ranges = [(0, k)]
+            while ranges:
+                low, high = ranges.pop()
+                if low < high:
+                    mid = (low + high) // 2
+                    self.insert(batch[mid])
+                    ranges.append((mid + 1, high))
+                    ranges.append((low, mid))
+            return
+        merged = list(heapq.merge(self.iter_inorder(), batch))
+        self.root = self._build(merged, 0, len(merged))
 
     def delete(self, value: int) -> None:
         """
         Remove a node with a specific value from the binary search tree.
         """
+        path = []
+        current = self.root
+        while current and current.value != value:
+            path.append(current)
+            current = current.left if value < current.value else current.right
+        if current is None:
+            return
 
-        def _delete(root, value):
-            if root is None:
-                return root
-            if value < root.value:
-                root.left = _delete(root.left, value)
-            elif value > root.value:
-                root.right = _delete(root.right, value)
-            else:
-                if root.left is None:
-                    return root.right
-                elif root.right is None:
-                    return root.left
-                min_node = self._find_min(root.right)
-                root.value = min_node.value
-                root.right = _delete(root.right, min_node.value)
-            return root
+        if current.left and current.right:
+            # Copy the in-order successor into this node and unlink it instead.
+            path.append(current)
+            successor = current.right
+            while successor.left:
+                path.append(successor)
+                successor = successor.left
+            current.value = successor.value
+            current = successor
 
-        self.root = _delete(self.root, value)
+        child = current.left or current.right
+        if not path:
+            self.root = child
+        elif path[-1].left is current:
+            path[-1].left = child
+        else:
+            path[-1].right = child
+        self._retrace(path)
 
     def search(self, value: int) -> TreeNode:
         """
         Search for a node with a specific value in the binary search tree.
         """
+        current = self.root
+        while current and current.value != value:
+            current = current.left if value < current.value else current.right
+        return current
 
-        def _search(root, value):
-            if root is None or root.value == value:
-                return root
-            if value < root.value:
-                return _search(root.left, value)
-            return _search(root.right, value)
+    def iter_inorder(self) -> Generator[int, None, None]:
+        """
+        Lazily yield the values of an in-order traversal.
+        """
+        stack = []
+        current = self.root
+        while stack or current:
+            while current:
+                stack.append(current)
+                current = current.left
+            current = stack.pop()
+            yield current.value
+            current = current.right
+
+    def iter_preorder(self) -> Generator[int, None, None]:
+        """
+        Lazily yield the values of a pre-order traversal.
+        """
+        stack = [self.root] if self.root else []
+        while stack:
+            current = stack.pop()
+            yield current.value
+            if current.right:
+                stack.append(current.right)
+            if current.left:
+                stack.append(current.left)
+
+    def iter_postorder(self) -> Generator[int, None, None]:
+        """
+        Lazily yield the values of a post-order traversal.
+        """
+        stack = []
+        current = self.root
+        last_visited = None
+        while stack or current:
+            while current:
+                stack.append(current)
+                current = current.left
+            top = stack[-1]
+            if top.right and top.right is not last_visited:
+                current = top.right
+            else:
+                yield top.value
+                last_visited = stack.pop()
 
-        return _search(self.root, value)
+    def iter_level_order(self) -> Generator[int, None, None]:
+        """
+        Lazily yield the values level by level, left to right.
+        """
+        pending = deque([self.root] if self.root else [])
+        while pending:
+            current = pending.popleft()
+            yield current.value
+            if current.left:
+                pending.append(current.left)
+            if current.right:
+                pending.append(current.right)
 
     def inorder_traversal(self) -> List[int]:
         """
         Perform an in-order traversal of the binary search tree.
         """
+        return list(self.iter_inorder())
 
-        def _inorder(root):
-            return (
-                _inorder(root.left) + [root.value] + _inorder(root.right)
-                if root
-                else []
-            )
+    def preorder_traversal(self) -> List[int]:
+        """
+        Perform a pre-order traversal of the binary search tree.
+        """
+        return list(self.iter_preorder())
 
-        return _inorder(self.root)
+    def postorder_traversal(self) -> List[int]:
+        """
+        Perform a post-order traversal of the binary search tree.
+        """
+        return list(self.iter_postorder())
+
+    def level_order_traversal(self) -> List[int]:
+        """
+        Perform a level-order (breadth-first) traversal of the binary search
+        tree.
+        """
+        return list(self.iter_level_order())
 
     def size(self) -> int:
         """
         Returns the number of nodes in the tree.
         """
-
-        def _size(root):
-            return 0 if root is None else 1 + _size(root.left) + _size(root.right)
-
-        return _size(self.root)
+        return self._size(self.root)
 
     def is_empty(self) -> bool:
         """
@@ -475,43 +2745,165 @@ class BinarySearchTree:
         """
         Returns the height of the tree.
         """
+        return self._height(self.root)
 
-        def _height(root):
-            if root is None:
-                return -1
-            left_height = _height(root.left)
-            right_height = _height(root.right)
-            return max(left_height, right_height) + 1
+    def select(self, k: int) -> TreeNode:
+        """
+        Returns the node holding the k-th smallest value (counting from 0).
+        """
+        if not 0 <= k < self.size():
+            raise IndexError("Index out of bounds")
+        current = self.root
+        while True:
+            left_size = self._size(current.left)
+            if k < left_size:
+                current = current.left
+            elif k > left_size:
+                k -= left_size + 1
+                current = current.right
+            else:
+                return current
 
-        return _height(self.root)
+    def rank(self, value: int) -> int:
+        """
+        Returns the number of values in the tree strictly less than ``value``.
+        """
+        rank = 0
+        current = self.root
+        while current:
+            if value <= current.value:
+                current = current.left
+            else:
+                rank += self._size(current.left) + 1
+                current = current.right
+        return rank
 
-    def preorder_traversal(self) -> List[int]:
+    def minimum(self) -> TreeNode:
         """
-        Perform a pre-order traversal of the binary search tree.
+        Returns the node with the smallest value, or None for an empty tree.
         """
+        return self._find_min(self.root) if self.root else None
 
-        def _preorder(root):
-            return (
-                [root.value] + _preorder(root.left) + _preorder(root.right)
-                if root
-                else []
-            )
+    def maximum(self) -> TreeNode:
+        """
+        Returns the node with the largest value, or None for an empty tree.
+        """
+        return self._find_max(self.root) if self.root else None
 
-        return _preorder(self.root)
+    def floor(self, value: int) -> TreeNode:
+        """
+        Returns the node with the largest value less than or equal to
+        ``value``, or None if there is none.
+        """
+        best = None
+        current = self.root
+        while current:
+            if current.value == value:
+                return current
+            if current.value < value:
+                best = current
+                current = current.right
+            else:
+                current = current.left
+        return best
 
-    def postorder_traversal(self) -> List[int]:
+    def ceiling(self, value: int) -> TreeNode:
         """
-        Perform a post-order traversal of the binary search tree.
+        Returns the node with the smallest value greater than or equal to
+        ``value``, or None if there is none.
         """
+        best = None
+        current = self.root
+        while current:
+            if current.value == value:
+                return current
+            if current.value > value:
+                best = current
+                current = current.left
+            else:
+                current = current.right
+        return best
 
-        def _postorder(root):
-            return (
-                _postorder(root.left) + _postorder(root.right) + [root.value]
-                if root
-                else []
-            )
+    def successor(self, value: int) -> TreeNode:
+        """
+        Returns the node with the smallest value strictly greater than
+        ``value``, or None if there is none.
+        """
+        best = None
+        current = self.root
+        while current:
+            if current.value > value:
+                best = current
+                current = current.left
+            else:
+                current = current.right
+        return best
 
-        return _postorder(self.root)
+    def predecessor(self, value: int) -> TreeNode:
+        """
+        Returns the node with the largest value strictly less than ``value``,
+        or None if there is none.
+        """
+        best = None
+        current = self.root
+        while current:
+            if current.value < value:
+                best = current
+                current = current.right
+            else:
+                current = current.left
+        return best
+
+    def range(self, low: int, high: int) -> Generator[int, None, None]:
+        """
+        Lazily yield the values in ``[low, high)`` in ascending order.
+
+        Subtrees entirely outside the range are never visited, so a full
+        iteration costs O(h + k) for k matching values.
+        """
+        stack = []
+        current = self.root
+        while stack or current:
+            while current:
+                if current.value < low:
+                    current = current.right
+                else:
+                    stack.append(current)
+                    current = current.left
+            if not stack:
+                return
+            current = stack.pop()
+            if current.value >= high:
+                return
+            yield current.value
+            current = current.right
+
+    def is_valid_bst(self) -> bool:
+        """
+        Checks that every node respects the ordering of its ancestors and has
+        an up-to-date height and size, and, for balanced trees, the AVL
+        invariant.
+        """
+        stack = [(self.root, None, None)]
+        while stack:
+            node, low, high = stack.pop()
+            if node is None:
+                continue
+            if (low is not None and node.value < low) or (
+                high is not None and node.value > high
+            ):
+                return False
+            left_height = self._height(node.left)
+            right_height = self._height(node.right)
+            if node.height != max(left_height, right_height) + 1:
+                return False
+            if self.balanced and abs(left_height - right_height) > 1:
+                return False
+            if node.size != self._size(node.left) + self._size(node.right) + 1:
+                return False
+            stack.append((node.left, low, node.value))
+            stack.append((node.right, node.value, high))
+        return True
 
     def _find_min(self, root: TreeNode) -> TreeNode:
         """
@@ -520,3 +2912,1231 @@ class BinarySearchTree:
         while root.left:
             root = root.left
         return root
+
+    def _find_max(self, root: TreeNode) -> TreeNode:
+        """
+        Find the node with the maximum value in a binary search tree.
+        """
+        while root.right:
+            root = root.right
+        return root
+
+    def _build(self, values: List[int], low: int, high: int) -> TreeNode:
+        """
+        Build a balanced subtree from the sorted slice ``values[low:high]``.
+        """
+        if low >= high:
+            return None
+        mid = (low + high) // 2
+        node = TreeNode(values[mid])
+        node.left = self._build(values, low, mid)
+        node.right = self._build(values, mid + 1, high)
+        self._update(node)
+        return node
+
+    def _retrace(self, path: List[TreeNode]) -> None:
+        """
+        Walk back up an insert/delete path, refreshing node heights and sizes
+        and, for balanced trees, rotating any node that has become unbalanced.
+        """
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            self._update(node)
+            if not self.balanced:
+                continue
+            subtree = self._rebalance(node)
+            if subtree is node:
+                continue
+            if i == 0:
+                self.root = subtree
+            elif path[i - 1].left is node:
+                path[i - 1].left = subtree
+            else:
+                path[i - 1].right = subtree
+
+    def _rebalance(self, node: TreeNode) -> TreeNode:
+        """
+        Restore the AVL invariant at a node and return the new subtree root.
+        """
+        balance = self._height(node.left) - self._height(node.right)
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _rotate_left(self, node: TreeNode) -> TreeNode:
+        """
+        Rotate a subtree to the left and return its new root.
+        """
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_right(self, node: TreeNode) -> TreeNode:
+        """
+        Rotate a subtree to the right and return its new root.
+        """
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    @staticmethod
+    def _update(node: TreeNode) -> None:
+        """
+        Recompute a node's height and size from its children.
+        """
+        left, right = node.left, node.right
+        if left and right:
+            node.height = max(left.height, right.height) + 1
+            node.size = left.size + right.size + 1
+        elif left:
+            node.height = left.height + 1
+            node.size = left.size + 1
+        elif right:
+            node.height = right.height + 1
+            node.size = right.size + 1
+        else:
+            node.height = 1
+            node.size = 1
+
+    @staticmethod
+    def _height(node: TreeNode) -> int:
+        """
+        Height of a possibly empty subtree.
+        """
+        return node.height if node else 0
+
+    @staticmethod
+    def _size(node: TreeNode) -> int:
+        """
+        Size of a possibly empty subtree.
+        """
+        return node.size if node else 0
+
+
+# Insertion sort takes over below this many elements inside merge and quick sort.
+_INSERTION_CUTOFF = 16
+
+# Ciura's empirically derived shell sort gaps, extended by x2.25 for large n.
+_CIURA_GAPS = (701, 301, 132, 57, 23, 10, 4, 1)
+
+# Galloping starts after one run wins this many comparisons in a row.
+_MIN_GALLOP = 7
+
+# merge_sort switches to adaptive_sort when runs average at least this long.
+_LONG_RUN = 16
+
+# counting_sort refuses key ranges wider than this many buckets.
+_COUNTING_MAX_RANGE = 1 << 24
+
+# Digit width of radix_sort's LSD passes: one byte per pass.
+_RADIX_BITS = 8
+_RADIX_MASK = (1 << _RADIX_BITS) - 1
+
+# Inputs shorter than this are sorted in-process even when ``parallel`` is set.
+_PARALLEL_THRESHOLD = 100_000
+
+
+def insertion_sort(
+    data: Iterable[Any],
+    key: Callable[[Any], Any] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+) -> List[Any]:
+    """
+    Sort with binary insertion sort. Stable, O(n^2) moves but O(n log n)
+    comparisons, and fast on small or nearly sorted inputs.
+    """
+    return _sort(_insertion_sort_core, data, key, reverse, in_place)
+
+
+def selection_sort(
+    data: Iterable[Any],
+    key: Callable[[Any], Any] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+) -> List[Any]:
+    """
+    Sort with selection sort. O(n^2) comparisons but at most n - 1 swaps.
+    """
+    return _sort(_selection_sort_core, data, key, reverse, in_place)
+
+
+def bubble_sort(
+    data: Iterable[Any],
+    key: Callable[[Any], Any] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+) -> List[Any]:
+    """
+    Sort with bubble sort. Stable, and each pass stops at the last swap so
+    sorted input takes a single O(n) pass.
+    """
+    return _sort(_bubble_sort_core, data, key, reverse, in_place)
+
+
+def shell_sort(
+    data: Iterable[Any],
+    key: Callable[[Any], Any] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+) -> List[Any]:
+    """
+    Sort with shell sort using Ciura's gap sequence. NumPy has no shell sort,
+    so typed numeric input uses its unstable ``quicksort`` (introsort).
+    """
+    return _sort(_shell_sort_core, data, key, reverse, in_place, kind="quicksort")
+
+
+def adaptive_sort(
+    data: Iterable[Any],
+    key: Callable[[Any], Any] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+) -> List[Any]:
+    """
+    Sort with a natural merge sort in the style of TimSort. Stable.
+
+    Existing runs are found and descending runs are reversed. Runs shorter
+    than a minimum length are extended by binary insertion, then runs are
+    merged from a stack that keeps the merges balanced. Merges skip the
+    prefix and suffix that are already in place and copy long streaks with
+    binary search and slice moves (galloping). Sorted or reverse-sorted
+    input takes O(n), and k runs take O(n log k).
+    """
+    return _sort(_adaptive_sort_core, data, key, reverse, in_place)
+
+
+def merge_sort(
+    data: Iterable[Any],
+    key: Callable[[Any], Any] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+    parallel: bool = False,
+    workers: int = None,
+    parallel_threshold: int = _PARALLEL_THRESHOLD,
+) -> List[Any]:
+    """
+    Sort with a stable bottom-up merge sort.
+
+    Runs of ``_INSERTION_CUTOFF`` elements are insertion sorted first, then
+    merged pairwise back and forth between the input and a single buffer
+    allocated once. Merges of runs that are already in order are skipped.
+    Input made of long ascending or descending runs is handed to
+    ``adaptive_sort`` instead.
+
+    ``array.array``, typed ``DynamicArray`` and one-dimensional numeric
+    NumPy arrays are sorted through their buffers and returned as the same
+    type, using NumPy's ``stable`` sort when NumPy is installed.
+    With ``parallel``, inputs of at least ``parallel_threshold`` elements
+    are split into chunks sorted in ``workers`` processes (see
+    ``_parallel_sort``).
+    """
+    core = _merge_sort_core
+    if parallel and _len(data) >= parallel_threshold:
+        core = partial(_parallel_sort, core, workers)
+    return _sort(core, data, key, reverse, in_place, kind="stable")
+
+
+def quick_sort(
+    data: Iterable[Any],
+    key: Callable[[Any], Any] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+    parallel: bool = False,
+    workers: int = None,
+    parallel_threshold: int = _PARALLEL_THRESHOLD,
+) -> List[Any]:
+    """
+    Sort with introsort: quick sort with median-of-three (ninther for large
+    ranges) pivots and three-way partitioning, so duplicate-heavy input stays
+    fast, falling back to heap sort when recursion gets too deep so the worst
+    case is O(n log n). Not stable. ``parallel``, ``workers``,
+    ``parallel_threshold`` and typed numeric input work as for ``merge_sort``,
+    with NumPy's ``quicksort``.
+    """
+    core = _quick_sort_core
+    if parallel and _len(data) >= parallel_threshold:
+        core = partial(_parallel_sort, core, workers)
+    return _sort(core, data, key, reverse, in_place, kind="quicksort")
+
+
+def counting_sort(
+    data: Iterable[int],
+    key: Callable[[Any], int] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+) -> List[Any]:
+    """
+    Sort integers (or items with integer keys) by counting how often each
+    value occurs. Stable, and O(n + k) for a range of k values, so it only
+    pays off when k is not much larger than n. Raises ``TypeError`` for
+    values or keys that are not ints, and ``ValueError`` when k is above
+    ``_COUNTING_MAX_RANGE``.
+    """
+    return _sort(_counting_sort_core, data, key, reverse, in_place, integer_keys=True)
+
+
+def radix_sort(
+    data: Iterable[int],
+    key: Callable[[Any], int] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+) -> List[Any]:
+    """
+    Sort integers (or items with integer keys) with a least-significant-digit
+    radix sort, one byte per pass. Stable.
+
+    Values are offset by the minimum, so negatives need no special case and
+    the number of passes depends only on the span: n values spanning b bits
+    take ceil(b / 8) passes of O(n). The passes ping-pong between two
+    preallocated ``array("Q")`` buffers (lists for spans of 64 bits or more).
+    A pass is skipped when every value has the same byte. When the range of
+    keys is no larger than n, counting sort is used instead. Raises
+    ``TypeError`` for values or keys that are not ints.
+    """
+    return _sort(_radix_sort_core, data, key, reverse, in_place, integer_keys=True)
+
+
+def auto_sort(
+    data: Iterable[Any],
+    key: Callable[[Any], Any] = None,
+    reverse: bool = False,
+    in_place: bool = False,
+) -> List[Any]:
+    """
+    Stable sort that chooses the algorithm from the data.
+
+    Typed numeric containers go to NumPy's ``stable`` sort when NumPy is
+    installed, and presorted input (see ``merge_sort``) to the adaptive merge
+    sort. Otherwise integers, or integer keys, use counting sort when their
+    range is no larger than n. They use radix sort when its byte passes cost
+    less than comparison sorting: when 2 * (passes + 1), with one pass per
+    byte of span, is below log2(n). Everything else uses ``merge_sort``.
+    """
+    return _sort(
+        _auto_sort_core, data, key, reverse, in_place, kind="stable", integer_keys=True
+    )
+
+
+def _sort(
+    core: Callable[[List[Any]], None],
+    data: Iterable[Any],
+    key: Callable[[Any], Any],
+    reverse: bool,
+    in_place: bool,
+    kind: str = None,
+    integer_keys: bool = False,
+) -> List[Any]:
+    """
+    Shared driver for the sort functions.
+
+    ``core`` sorts a list in place in ascending order. With ``in_place`` the
+    input list itself is sorted and returned, otherwise a sorted copy is
+    returned. Keys are computed once per element, and ``reverse`` keeps equal
+    elements in their original order, like ``sorted``. Cores that take
+    ``integer_keys`` are given ``key * n + index`` ints and the base ``n``
+    instead of ``(key, index)`` pairs when every key is an int. When the
+    caller gives a NumPy ``kind``, numeric typed containers without a key
+    are handled by ``_sort_typed`` and keep their type; other sorts return a
+    list for them.
+    """
+    if key is None and kind is not None:
+        result = _sort_typed(core, data, reverse, in_place, kind)
+        if result is not None:
+            return result
+    items = data if in_place else list(data)
+    if reverse:
+        items.reverse()
+    if key is None:
+        core(items)
+    else:
+        keys = [key(value) for value in items]
+        n = len(items)
+        if integer_keys and _all_integers(keys):
+            # key * n + i orders exactly like (key, i), and stays an int.
+            packed = [k * n + i for i, k in enumerate(keys)]
+            core(packed, n)
+            items[:] = [items[p % n] for p in packed]
+        else:
+            decorated = list(zip(keys, range(n)))
+            core(decorated)
+            items[:] = [items[i] for _, i in decorated]
+    if reverse:
+        items.reverse()
+    return items
+
+
+def _sort_typed(
+    core: Callable[[List[Any]], None],
+    data: Any,
+    reverse: bool,
+    in_place: bool,
+    kind: str,
+) -> Any:
+    """
+    Sort an ``array.array``, a typed ``DynamicArray`` or a one-dimensional
+    numeric NumPy array through its buffer, returning the same container
+    type (the input itself with ``in_place``). Returns None for anything else.
+    """
+    if np is not None and isinstance(data, np.ndarray):
+        if data.ndim != 1 or data.dtype.kind not in "biuf":
+            return None
+        result = data if in_place else data.copy()
+        _sort_buffer(core, result, reverse, kind)
+        return result
+    if isinstance(data, array):
+        if data.typecode in "uw":
+            return None
+        result = data if in_place else data[:]
+        with memoryview(result) as view:
+            _sort_buffer(core, view, reverse, kind)
+        return result
+    if isinstance(data, DynamicArray) and data.typecode is not None:
+        result = data
+        if not in_place:
+            result = DynamicArray(data.typecode, capacity=len(data))
+            with data.buffer() as view:
+                result.extend(view)
+        with result.buffer() as view:
+            _sort_buffer(core, view, reverse, kind)
+        return result
+    return None
+
+
+def _sort_buffer(
+    core: Callable[[List[Any]], None], values: Any, reverse: bool, kind: str
+) -> None:
+    """
+    Sort a writable one-dimensional typed buffer (a memoryview or ndarray) in
+    place: with ``numpy.sort`` of the given ``kind`` when NumPy is installed,
+    otherwise by running ``core`` on a list copy and writing it back.
+    """
+    if np is not None:
+        vector = np.asarray(values)
+        if reverse:
+            # Same trick as _sort: a stable sort of the reversed input,
+            # reversed again, keeps equal values in their original order.
+            vector[:] = np.sort(vector[::-1], kind=kind)[::-1]
+        else:
+            vector.sort(kind=kind)
+        return
+    items = values.tolist()
+    _sort(core, items, None, reverse, True)
+    if isinstance(values, memoryview):
+        items = array(values.format, items)
+    values[:] = items
+
+
+def _len(data: Iterable[Any]) -> int:
+    """
+    Length of ``data``, or 0 if it has none (a one-shot iterator).
+    """
+    try:
+        return len(data)
+    except TypeError:
+        return 0
+
+
+def _parallel_sort(
+    core: Callable[[List[Any]], None], workers: int, a: List[Any]
+) -> None:
+    """
+    Sort ``a`` in place by splitting it into one contiguous chunk per worker,
+    sorting the chunks with ``core`` in a process pool and k-way merging the
+    sorted chunks with ``heapq.merge``, which is stable.
+
+    Lists of plain ints that fit in 64 bits, or of floats, are copied once
+    into a shared memory buffer of typecode ``q`` or ``d`` that the workers
+    sort in place, so no values are pickled. Anything else is sent to the
+    workers as pickled chunks.
+    """
+    workers = workers or os.cpu_count() or 1
+    n = len(a)
+    bounds = [n * i // workers for i in range(workers + 1)]
+    chunks = list(zip(bounds, bounds[1:]))
+    typecode = _shared_typecode(a)
+    if typecode is None:
+        with ProcessPoolExecutor(workers) as pool:
+            runs = pool.map(
+                _sort_chunk, repeat(core), (a[low:high] for low, high in chunks)
+            )
+            a[:] = heapq.merge(*runs)
+        return
+
+    itemsize = array(typecode).itemsize
+    shared = SharedMemory(create=True, size=max(n * itemsize, 1))
+    try:
+        with shared.buf[:n * itemsize].cast(typecode) as view:
+            view[:] = array(typecode, a)
+            with ProcessPoolExecutor(workers) as pool:
+                done = pool.map(
+                    _sort_shared_chunk,
+                    repeat(core),
+                    repeat(shared.name),
+                    repeat(typecode),
+                    bounds,
+                    bounds[1:],
+                )
+                list(done)
+            a[:] = heapq.merge(*(view[low:high].tolist() for low, high in chunks))
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def _shared_typecode(a: List[Any]) -> str:
+    """
+    The ``array`` typecode that holds every value of ``a`` exactly, or None.
+    """
+    if a and all(type(value) is int for value in a):
+        if -(1 << 63) <= min(a) and max(a) < 1 << 63:
+            return "q"
+    elif a and all(type(value) is float for value in a):
+        return "d"
+    return None
+
+
+def _sort_chunk(core: Callable[[List[Any]], None], chunk: List[Any]) -> List[Any]:
+    """
+    Worker: sort a pickled chunk and send it back.
+    """
+    core(chunk)
+    return chunk
+
+
+def _sort_shared_chunk(
+    core: Callable[[List[Any]], None], name: str, typecode: str, low: int, high: int
+) -> None:
+    """
+    Worker: sort ``[low:high]`` of the shared memory buffer ``name`` in place.
+    """
+    shared = SharedMemory(name=name)
+    try:
+        itemsize = array(typecode).itemsize
+        with shared.buf[low * itemsize:high * itemsize].cast(typecode) as view:
+            chunk = view.tolist()
+            core(chunk)
+            view[:] = array(typecode, chunk)
+    finally:
+        shared.close()
+
+
+def _insertion_sort_core(a: List[Any]) -> None:
+    """
+    Insertion sort the whole list.
+    """
+    _insertion_sort_range(a, 0, len(a))
+
+
+def _insertion_sort_range(a: List[Any], low: int, high: int) -> None:
+    """
+    Binary insertion sort of ``a[low:high]``, shifting with slice moves.
+    """
+    for i in range(low + 1, high):
+        value = a[i]
+        if not value < a[i - 1]:
+            continue
+        position = bisect.bisect_right(a, value, low, i)
+        a[position + 1:i + 1] = a[position:i]
+        a[position] = value
+
+
+def _selection_sort_core(a: List[Any]) -> None:
+    """
+    Repeatedly swap the smallest remaining value into place.
+    """
+    n = len(a)
+    for i in range(n - 1):
+        smallest = min(range(i, n), key=a.__getitem__)
+        if smallest != i:
+            a[i], a[smallest] = a[smallest], a[i]
+
+
+def _bubble_sort_core(a: List[Any]) -> None:
+    """
+    Bubble sort, shrinking each pass to end at the previous pass's last swap.
+    """
+    end = len(a)
+    while end > 1:
+        last_swap = 0
+        for j in range(1, end):
+            if a[j] < a[j - 1]:
+                a[j - 1], a[j] = a[j], a[j - 1]
+                last_swap = j
+        end = last_swap
+
+
+def _shell_gaps(n: int) -> List[int]:
+    """
+    Ciura gaps smaller than ``n``, in decreasing order.
+    """
+    gaps = list(_CIURA_GAPS)
+    while gaps[0] * 2.25 < n:
+        gaps.insert(0, int(gaps[0] * 2.25))
+    return [gap for gap in gaps if gap < n]
+
+
+def _shell_sort_core(a: List[Any]) -> None:
+    """
+    Gapped insertion sort for every gap in the sequence.
+    """
+    n = len(a)
+    for gap in _shell_gaps(n):
+        for i in range(gap, n):
+            value = a[i]
+            j = i
+            while j >= gap and value < a[j - gap]:
+                a[j] = a[j - gap]
+                j -= gap
+            a[j] = value
+
+
+def _merge_sort_core(a: List[Any]) -> None:
+    """
+    Bottom-up merge sort that ping-pongs between the list and one buffer,
+    or the adaptive sort when the list has long runs.
+    """
+    n = len(a)
+    if _has_long_runs(a):
+        _adaptive_sort_core(a)
+        return
+    width = _INSERTION_CUTOFF
+    for low in range(0, n, width):
+        _insertion_sort_range(a, low, min(low + width, n))
+    if n <= width:
+        return
+
+    source, target = a, [None] * n
+    while width < n:
+        for low in range(0, n, 2 * width):
+            _merge(source, target, low, min(low + width, n), min(low + 2 * width, n))
+        source, target = target, source
+        width *= 2
+    if source is not a:
+        a[:] = source
+
+
+def _merge(
+    source: List[Any], target: List[Any], low: int, mid: int, high: int
+) -> None:
+    """
+    Stably merge the sorted runs ``source[low:mid]`` and ``source[mid:high]``
+    into ``target[low:high]``.
+    """
+    if mid >= high or not source[mid] < source[mid - 1]:
+        target[low:high] = source[low:high]
+        return
+    i, j, k = low, mid, low
+    while i < mid and j < high:
+        if source[j] < source[i]:
+            target[k] = source[j]
+            j += 1
+        else:
+            target[k] = source[i]
+            i += 1
+        k += 1
+    if i < mid:
+        target[k:high] = source[i:mid]
+    else:
+        target[k:high] = source[j:high]
+
+
+def _has_long_runs(a: List[Any]) -> bool:
+    """
+    Whether the runs of ``a`` average at least ``_LONG_RUN`` elements.
+
+    A run ends wherever the direction between neighbours changes. Both
+    passes use ``map`` over C-level comparisons, so the check costs a small
+    fraction of a sort.
+    """
+    n = len(a)
+    if n < 2 * _LONG_RUN:
+        return False
+    descents = list(map(operator.lt, islice(a, 1, None), a))
+    turns = sum(map(operator.ne, islice(descents, 1, None), descents))
+    return (turns + 1) * _LONG_RUN <= n
+
+
+def _adaptive_sort_core(a: List[Any]) -> None:
+    """
+    Find or build runs of at least ``_min_run(n)`` elements and merge them,
+    keeping the stack of pending runs balanced like TimSort does.
+    """
+    n = len(a)
+    if n < 2:
+        return
+    min_run = _min_run(n)
+    runs = []
+    low = 0
+    while low < n:
+        length = _count_run(a, low, n)
+        if length < min_run:
+            length = min(min_run, n - low)
+            _insertion_sort_range(a, low, low + length)
+        runs.append([low, length])
+        _merge_collapse(a, runs)
+        low += length
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        _merge_at(a, runs, i)
+
+
+def _min_run(n: int) -> int:
+    """
+    A run length between 32 and 64 that splits ``n`` into a power of two
+    runs, or slightly fewer, so the final merges are balanced.
+    """
+    extra = 0
+    while n >= 64:
+        extra |= n & 1
+        n >>= 1
+    return n + extra
+
+
+def _count_run(a: List[Any], low: int, n: int) -> int:
+    """
+    Length of the run starting at ``low``. A strictly descending run is
+    reversed in place; strictness keeps equal elements in order.
+    """
+    high = low + 1
+    if high == n:
+        return 1
+    if a[high] < a[low]:
+        high += 1
+        while high < n and a[high] < a[high - 1]:
+            high += 1
+        a[low:high] = a[low:high][::-1]
+    else:
+        high += 1
+        while high < n and not a[high] < a[high - 1]:
+            high += 1
+    return high - low
+
+
+def _merge_collapse(a: List[Any], runs: List[List[int]]) -> None:
+    """
+    Merge pending runs until each run is longer than the next one and than
+    the next two combined (checked for the top four, which fixes the hole in
+    the original TimSort invariant).
+    """
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or (
+            i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]
+        ):
+            if runs[i - 1][1] < runs[i + 1][1]:
+                i -= 1
+        elif runs[i][1] > runs[i + 1][1]:
+            return
+        _merge_at(a, runs, i)
+
+
+def _merge_at(a: List[Any], runs: List[List[int]], i: int) -> None:
+    """
+    Merge the adjacent pending runs ``i`` and ``i + 1``.
+
+    The left run's prefix that is not greater than the right run's first
+    element, and the right run's suffix that is not less than the left run's
+    last element, are already in place. Only the rest is merged, buffering
+    whichever side is shorter.
+    """
+    low, left_length = runs[i]
+    mid = low + left_length
+    high = mid + runs[i + 1][1]
+    runs[i][1] += runs[i + 1][1]
+    del runs[i + 1]
+    low = bisect.bisect_right(a, a[mid], low, mid)
+    if low == mid:
+        return
+    high = bisect.bisect_left(a, a[mid - 1], mid, high)
+    if mid - low <= high - mid:
+        _merge_low(a, low, mid, high)
+    else:
+        _merge_high(a, low, mid, high)
+
+
+def _merge_low(a: List[Any], low: int, mid: int, high: int) -> None:
+    """
+    Merge ``a[low:mid]`` and ``a[mid:high]`` front to back, buffering the
+    left run. After ``_MIN_GALLOP`` wins in a row by one side, the rest of
+    its streak is found by binary search and moved as one slice.
+    """
+    left = a[low:mid]
+    end = mid - low
+    i, j, k = 0, mid, low
+    left_wins = right_wins = 0
+    while i < end and j < high:
+        if a[j] < left[i]:
+            a[k] = a[j]
+            j += 1
+            k += 1
+            right_wins += 1
+            left_wins = 0
+            if right_wins >= _MIN_GALLOP:
+                stop = bisect.bisect_left(a, left[i], j, high)
+                a[k:k + stop - j] = a[j:stop]
+                k += stop - j
+                j = stop
+                right_wins = 0
+        else:
+            a[k] = left[i]
+            i += 1
+            k += 1
+            left_wins += 1
+            right_wins = 0
+            if left_wins >= _MIN_GALLOP and j < high:
+                stop = bisect.bisect_right(left, a[j], i, end)
+                a[k:k + stop - i] = left[i:stop]
+                k += stop - i
+                i = stop
+                left_wins = 0
+    # Whatever remains of the right run is already in place.
+    a[k:k + end - i] = left[i:end]
+
+
+def _merge_high(a: List[Any], low: int, mid: int, high: int) -> None:
+    """
+    Merge ``a[low:mid]`` and ``a[mid:high]`` back to front, buffering the
+    right run. Mirrors ``_merge_low``.
+    """
+    right = a[mid:high]
+    i, j, k = mid - 1, high - mid - 1, high - 1
+    left_wins = right_wins = 0
+    while i >= low and j >= 0:
+        if right[j] < a[i]:
+            a[k] = a[i]
+            i -= 1
+            k -= 1
+            left_wins += 1
+            right_wins = 0
+            if left_wins >= _MIN_GALLOP:
+                start = bisect.bisect_right(a, right[j], low, i + 1)
+                a[k - i + start:k + 1] = a[start:i + 1]
+                k -= i + 1 - start
+                i = start - 1
+                left_wins = 0
+        else:
+            a[k] = right[j]
+            j -= 1
+            k -= 1
+            right_wins += 1
+            left_wins = 0
+            if right_wins >= _MIN_GALLOP and i >= low:
+                start = bisect.bisect_left(right, a[i], 0, j + 1)
+                a[k - j + start:k + 1] = right[start:j + 1]
+                k -= j + 1 - start
+                j = start - 1
+                right_wins = 0
+    # Whatever remains of the left run is already in place.
+    a[low:low + j + 1] = right[:j + 1]
+
+
+def _all_integers(values: Iterable[Any]) -> bool:
+    """
+    Whether every value is exactly an ``int`` (not a bool or other subclass,
+    which the integer sorts would turn into plain ints).
+    """
+    return set(map(type, values)) <= {int}
+
+
+def _require_integers(a: List[Any], name: str) -> None:
+    if not _all_integers(a):
+        raise TypeError(f"{name} requires integer values or keys")
+
+
+def _counting_sort_core(a: List[int], base: int = 1) -> None:
+    """
+    Counting sort of ints. With ``base`` > 1 the ints are packed
+    ``key * base + index`` values and are ordered by key alone, which keeps
+    them in index order within a key.
+    """
+    _require_integers(a, "counting_sort")
+    if len(a) < 2:
+        return
+    if max(a) // base - min(a) // base >= _COUNTING_MAX_RANGE:
+        raise ValueError("Key range is too large for counting_sort")
+    if base == 1:
+        _count_values(a, min(a), max(a))
+        return
+    keys = list(map(operator.floordiv, a, repeat(base)))
+    low = min(keys)
+    digits = list(map(operator.sub, keys, repeat(low)))
+    target = [0] * len(a)
+    _scatter(a, target, digits, max(keys) - low + 1)
+    a[:] = target
+
+
+def _count_values(a: List[int], low: int, high: int) -> None:
+    """
+    Rewrite ``a``, whose values lie in ``[low, high]``, in order from a count
+    of each value. Equal ints are interchangeable, so no stable placement
+    pass is needed.
+    """
+    counts = Counter(a)
+    position = 0
+    for value in range(low, high + 1):
+        count = counts.get(value)
+        if count:
+            a[position:position + count] = repeat(value, count)
+            position += count
+
+
+def _scatter(source: Any, target: Any, digits: List[int], size: int) -> None:
+    """
+    One stable counting pass: move each value of ``source`` into ``target``
+    ordered by its digit, where every digit is in ``range(size)``.
+    """
+    counts = [0] * size
+    for digit, count in Counter(digits).items():
+        counts[digit] = count
+    starts = list(accumulate(counts, initial=0))
+    for value, digit in zip(source, digits):
+        position = starts[digit]
+        target[position] = value
+        starts[digit] = position + 1
+
+
+def _radix_sort_core(a: List[int], base: int = 1) -> None:
+    """
+    Radix sort of ints, or counting sort when the key range is at most n.
+    ``base`` is as for ``_counting_sort_core``; radix passes order packed
+    values fully, which is the same order.
+    """
+    _require_integers(a, "radix_sort")
+    n = len(a)
+    if n < 2:
+        return
+    low, high = min(a), max(a)
+    if high // base - low // base <= n:
+        _counting_sort_core(a, base)
+    else:
+        _radix_passes(a, low, high)
+
+
+def _radix_passes(a: List[int], low: int, high: int) -> None:
+    """
+    LSD radix sort of ints in ``[low, high]``, ``_RADIX_BITS`` per pass.
+    Digits are extracted with ``map`` over ``operator`` functions, so only
+    the scatter loop runs per element in Python.
+    """
+    n = len(a)
+    span = high - low
+    offset = map(operator.sub, a, repeat(low))
+    if span >> 64:
+        source, target = list(offset), [0] * n
+    else:
+        source, target = array("Q", offset), array("Q", bytes(8 * n))
+    for shift in range(0, span.bit_length(), _RADIX_BITS):
+        shifted = map(operator.rshift, source, repeat(shift))
+        digits = list(map(operator.and_, shifted, repeat(_RADIX_MASK)))
+        if digits.count(digits[0]) == n:
+            continue
+        _scatter(source, target, digits, _RADIX_MASK + 1)
+        source, target = target, source
+    a[:] = map(operator.add, source, repeat(low))
+
+
+def _auto_sort_core(a: List[Any], base: int = 1) -> None:
+    """
+    Counting, radix or merge sort, whichever the values suit (see
+    ``auto_sort``).
+    """
+    n = len(a)
+    if n < 2 or not _all_integers(a) or _has_long_runs(a):
+        _merge_sort_core(a)
+        return
+    low, high = min(a), max(a)
+    passes = -(-(high - low).bit_length() // _RADIX_BITS)
+    if high // base - low // base <= n:
+        _counting_sort_core(a, base)
+    elif 2 * (passes + 1) < n.bit_length():
+        _radix_passes(a, low, high)
+    else:
+        _merge_sort_core(a)
+
+
+def _quick_sort_core(a: List[Any]) -> None:
+    """
+    Introsort with a depth limit of about 2 log2(n).
+    """
+    _introsort(a, 0, len(a), 2 * len(a).bit_length())
+
+
+def _introsort(a: List[Any], low: int, high: int, depth: int) -> None:
+    """
+    Sort ``a[low:high]``, recursing into the smaller partition and looping on
+    the larger one so the stack stays O(log n).
+    """
+    while high - low > _INSERTION_CUTOFF:
+        if depth == 0:
+            _heap_sort_range(a, low, high)
+            return
+        depth -= 1
+        lt, gt = _partition3(a, low, high, _choose_pivot(a, low, high))
+        if lt - low < high - gt:
+            _introsort(a, low, lt, depth)
+            low = gt
+        else:
+            _introsort(a, gt, high, depth)
+            high = lt
+    _insertion_sort_range(a, low, high)
+
+
+def _choose_pivot(a: List[Any], low: int, high: int) -> Any:
+    """
+    Median of three for small ranges, Tukey's ninther for larger ones.
+    """
+    last = high - 1
+    mid = (low + last) // 2
+    if high - low > 40:
+        step = (high - low) // 8
+        return _median3(
+            _median3(a[low], a[low + step], a[low + 2 * step]),
+            _median3(a[mid - step], a[mid], a[mid + step]),
+            _median3(a[last - 2 * step], a[last - step], a[last]),
+        )
+    return _median3(a[low], a[mid], a[last])
+
+
+def _median3(x: Any, y: Any, z: Any) -> Any:
+    """
+    Median of three values.
+    """
+    if y < x:
+        x, y = y, x
+    if z < y:
+        y = z
+        if y < x:
+            y = x
+    return y
+
+
+def _partition3(a: List[Any], low: int, high: int, pivot: Any) -> Tuple[int, int]:
+    """
+    Dijkstra three-way partition of ``a[low:high]`` around ``pivot``.
+
+    Returns ``(lt, gt)`` such that ``a[low:lt] < pivot``,
+    ``a[lt:gt] == pivot`` and ``a[gt:high] > pivot``.
+    """
+    lt, i, gt = low, low, high
+    while i < gt:
+        value = a[i]
+        if value < pivot:
+            a[lt], a[i] = value, a[lt]
+            lt += 1
+            i += 1
+        elif pivot < value:
+            gt -= 1
+            a[i], a[gt] = a[gt], value
+        else:
+            i += 1
+    return lt, gt
+
+
+def _heap_sort_range(a: List[Any], low: int, high: int) -> None:
+    """
+    Heap sort of ``a[low:high]``.
+    """
+    n = high - low
+    for start in range(n // 2 - 1, -1, -1):
+        _sift_down(a, low, start, n)
+    for end in range(n - 1, 0, -1):
+        a[low], a[low + end] = a[low + end], a[low]
+        _sift_down(a, low, 0, end)
+
+
+def _sift_down(a: List[Any], low: int, root: int, end: int) -> None:
+    """
+    Restore the max-heap property for the heap stored in ``a[low:low + end]``.
+    """
+    value = a[low + root]
+    child = 2 * root + 1
+    while child < end:
+        if child + 1 < end and a[low + child] < a[low + child + 1]:
+            child += 1
+        if not value < a[low + child]:
+            break
+        a[low + root] = a[low + child]
+        root = child
+        child = 2 * root + 1
+    a[low + root] = value
+
+
+# Estimated peak bytes per element while a run is sorted in memory: the list
+# slot and int/float object, merge_sort's buffer slot and the typed copy.
+_RUN_BYTES_PER_ITEM = 64
+
+# Upper bound on the output buffer of the k-way merge.
+_MAX_WRITE_BUFFER = 8 << 20
+
+# Most run files merged at once; each open mapping holds a file descriptor.
+_MERGE_FAN_IN = 128
+
+
+class ExternalSortStats:
+    def __init__(self):
+        """
+        Counters reported by ``external_sort`` and passed to its progress
+        callback: runs spilled, records read from the input, records written
+        to the output, extra merge passes needed to keep the number of open
+        runs bounded, and bytes read and written across the input, the run
+        files and the output.
+        """
+        self.runs = 0
+        self.merge_passes = 0
+        self.items = 0
+        self.items_written = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+def external_sort(
+    input_path: str,
+    output_path: str,
+    memory_limit: int = 64 << 20,
+    typecode: str = "q",
+    reverse: bool = False,
+    sort: Callable[..., List[Any]] = merge_sort,
+    progress: Callable[[ExternalSortStats], None] = None,
+    temp_dir: str = None,
+) -> ExternalSortStats:
+    """
+    Sort a binary file of native ``array`` records of ``typecode`` into
+    ``output_path``, using about ``memory_limit`` bytes of memory.
+
+    The input is read in runs sized to fit the limit. Each run is sorted
+    with ``sort`` (``merge_sort`` by default, so equal records keep their
+    order) and spilled to a run file in ``temp_dir``. The run files are
+    memory mapped and k-way merged with ``heapq.merge``, in several passes
+    when there are more than ``_MERGE_FAN_IN`` of them. Output is written
+    through a buffer of up to 8 MiB. A single run is written straight to
+    the output. ``progress`` is called with the stats after every spilled
+    run and every output write.
+    """
+    itemsize = array(typecode).itemsize
+    size = os.path.getsize(input_path)
+    if size % itemsize:
+        raise ValueError(f"Input size is not a multiple of {itemsize} bytes")
+    run_items = max(1, memory_limit // _RUN_BYTES_PER_ITEM)
+    write_items = max(1, min(memory_limit // 2, _MAX_WRITE_BUFFER) // itemsize)
+    stats = ExternalSortStats()
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as workdir:
+        run_paths = []
+        with open(input_path, "rb") as source:
+            while True:
+                values = _read_records(source, typecode, run_items).tolist()
+                if not values and run_paths:
+                    break
+                stats.items += len(values)
+                stats.bytes_read += len(values) * itemsize
+                sort(values, reverse=reverse, in_place=True)
+                records = array(typecode, values)
+                del values
+                if not run_paths and stats.items * itemsize == size:
+                    _spill(records, output_path, stats, progress)
+                    stats.items_written = stats.items
+                    return stats
+                run_paths.append(os.path.join(workdir, f"run{len(run_paths)}.bin"))
+                _spill(records, run_paths[-1], stats, progress)
+                stats.runs += 1
+
+        while len(run_paths) > _MERGE_FAN_IN:
+            stats.merge_passes += 1
+            merged_paths = []
+            for low in range(0, len(run_paths), _MERGE_FAN_IN):
+                group = run_paths[low:low + _MERGE_FAN_IN]
+                path = os.path.join(workdir, f"pass{stats.merge_passes}-{low}.bin")
+                _merge_runs(group, path, typecode, reverse, write_items, stats)
+                for run_path in group:
+                    os.remove(run_path)
+                merged_paths.append(path)
+            run_paths = merged_paths
+        _merge_runs(
+            run_paths, output_path, typecode, reverse, write_items, stats, progress
+        )
+    return stats
+
+
+def _merge_runs(
+    run_paths: List[str],
+    output_path: str,
+    typecode: str,
+    reverse: bool,
+    write_items: int,
+    stats: ExternalSortStats,
+    progress: Callable[[ExternalSortStats], None] = None,
+) -> None:
+    """
+    K-way merge memory-mapped run files into ``output_path``, writing
+    ``write_items`` records at a time. Only the final merge into the output
+    passes ``progress`` and counts towards ``items_written``.
+    """
+    itemsize = array(typecode).itemsize
+    with ExitStack() as stack, open(output_path, "wb") as target:
+        runs = [_map_records(stack, path, typecode) for path in run_paths]
+        merged = heapq.merge(*runs, reverse=reverse)
+        while True:
+            chunk = array(typecode, islice(merged, write_items))
+            if not chunk:
+                break
+            chunk.tofile(target)
+            stats.bytes_read += len(chunk) * itemsize
+            stats.bytes_written += len(chunk) * itemsize
+            if progress is not None:
+                stats.items_written += len(chunk)
+                progress(stats)
+        del merged, runs
+
+
+def _read_records(source: BinaryIO, typecode: str, n: int) -> array:
+    """
+    Read up to ``n`` records from a binary file.
+    """
+    records = array(typecode)
+    try:
+        records.fromfile(source, n)
+    except EOFError:
+        pass  # A short final run; fromfile keeps what it read.
+    return records
+
+
+def _spill(
+    records: array,
+    path: str,
+    stats: ExternalSortStats,
+    progress: Callable[[ExternalSortStats], None],
+) -> None:
+    """
+    Write sorted records to ``path`` and report it.
+    """
+    with open(path, "wb") as target:
+        records.tofile(target)
+    stats.bytes_written += len(records) * records.itemsize
+    if progress is not None:
+        progress(stats)
+
+
+def _map_records(stack: ExitStack, path: str, typecode: str) -> memoryview:
+    """
+    Memory map a run file read-only and view it as typed records. The
+    mapping and view are released when ``stack`` closes.
+    """
+    with open(path, "rb") as run:
+        mapped = mmap.mmap(run.fileno(), 0, access=mmap.ACCESS_READ)
+    stack.enter_context(mapped)
+    return stack.enter_context(memoryview(mapped).cast(typecode))
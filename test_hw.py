@@ -1,4 +1,13 @@
+import asyncio
+import contextlib
+import io
+import os
+import queue
+import random
+import tempfile
+import threading
 import unittest
+from array import array
 
 import hw
 
@@ -36,6 +45,122 @@ class TestDynamicArray(unittest.TestCase):
         self.array.delete(0)
         self.assertEqual(self.array.get(0), 10)
 
+    def test_growth(self):
+        for i in range(9):
+            self.array.append(i)
+        self.assertEqual(len(self.array), 9)
+        self.assertEqual(self.array.capacity, 16)
+        self.assertEqual(self.array.resize_count, 5)
+        self.assertEqual([self.array.get(i) for i in range(9)], list(range(9)))
+
+    def test_shrink_with_hysteresis(self):
+        for i in range(16):
+            self.array.append(i)
+        for _ in range(11):
+            self.array.delete(0)
+        self.assertEqual(self.array.capacity, 16)
+        self.array.delete(0)
+        self.assertEqual(self.array.capacity, 8)
+        self.assertEqual(self.array.get(0), 12)
+
+    def test_reserve_and_shrink_to_fit(self):
+        self.array.reserve(100)
+        for i in range(100):
+            self.array.append(i)
+        self.assertEqual(self.array.resize_count, 1)
+        for _ in range(90):
+            self.array.delete(len(self.array) - 1)
+        self.assertEqual(self.array.capacity, 100)
+        self.array.shrink_to_fit()
+        self.assertEqual(self.array.capacity, 10)
+
+    def test_growth_factor(self):
+        array = hw.DynamicArray(capacity=10, growth_factor=1.5)
+        for i in range(11):
+            array.append(i)
+        self.assertEqual(array.capacity, 15)
+        with self.assertRaises(ValueError):
+            hw.DynamicArray(growth_factor=1)
+
+    def test_extend_insert_many_delete_range(self):
+        self.array.extend(range(5))
+        self.array.insert_many(2, [10, 11, 12])
+        self.assertEqual(list(self.array), [0, 1, 10, 11, 12, 2, 3, 4])
+        self.array.delete_range(1, 4)
+        self.assertEqual(list(self.array), [0, 12, 2, 3, 4])
+        with self.assertRaises(IndexError):
+            self.array.delete_range(3, 9)
+
+    def test_item_and_slice_access(self):
+        self.array.extend(range(6))
+        self.assertEqual(self.array[-1], 5)
+        self.assertEqual(self.array[1:3], [1, 2])
+        self.assertEqual(self.array[::2], [0, 2, 4])
+        self.array[0] = 9
+        self.array[1:3] = [7]
+        self.assertEqual(list(self.array), [9, 7, 3, 4, 5])
+        with self.assertRaises(IndexError):
+            self.array[5]
+
+    def test_get_slice_is_a_view(self):
+        self.array.extend(range(6))
+        view = self.array.get_slice(2, 5)
+        self.assertEqual(len(view), 3)
+        self.assertEqual(view.tolist(), [2, 3, 4])
+        view[0] = 20
+        self.assertEqual(self.array.get(2), 20)
+        self.assertEqual(list(view[1:]), [3, 4])
+
+    def test_view_rejects_slice_assignment_and_stale_access(self):
+        self.array.extend(range(6))
+        view = self.array.get_slice(2, 5)
+        with self.assertRaises(TypeError):
+            view[0:2] = [7, 8]
+        self.array.delete_range(3, 6)
+        for access in [
+            lambda: view[0],
+            lambda: view.__setitem__(0, 1),
+            lambda: list(view),
+            view.tolist,
+        ]:
+            with self.assertRaises(IndexError):
+                access()
+        self.assertEqual(list(self.array), [0, 1, 2])
+
+    def test_typed_batch_operations(self):
+        array = hw.DynamicArray(typecode="q")
+        array.extend([1, 2, 3])
+        array.insert_many(0, [-1, 0])
+        self.assertEqual(array.get_slice(1, 4).buffer().tolist(), [0, 1, 2])
+
+    def test_out_of_bounds(self):
+        with self.assertRaises(IndexError):
+            self.array.insert(1, 5)
+        with self.assertRaises(IndexError):
+            self.array.get(0)
+
+class TestTypedArrays(unittest.TestCase):
+    def test_static_array_typed(self):
+        array = hw.StaticArray(4, typecode="q")
+        self.assertEqual(array.get(3), 0)
+        array.set(1, -7)
+        view = array.buffer()
+        self.assertEqual(view.format, "q")
+        self.assertEqual(view[1], -7)
+        view[2] = 9
+        self.assertEqual(array.get(2), 9)
+        with self.assertRaises(TypeError):
+            hw.StaticArray(4).buffer()
+
+    def test_dynamic_array_typed(self):
+        array = hw.DynamicArray(typecode="d")
+        array.append(1.5)
+        array.insert(0, 0.5)
+        self.assertEqual(array.get(1), 1.5)
+        self.assertEqual(array.buffer().tolist(), [0.5, 1.5])
+        with self.assertRaises(TypeError):
+            array.append("x")
+
 import unittest
 
 class TestSinglyLinkedList(unittest.TestCase):
@@ -83,6 +208,114 @@ class TestSinglyLinkedList(unittest.TestCase):
         self.assertEqual(self.list.get_tail().value, 1)
 
 
+class TestIndexedLinkedLists(unittest.TestCase):
+    def values(self, linked_list):
+        values = []
+        current = linked_list.get_head()
+        while current:
+            values.append(current.value)
+            current = current.next
+        return values
+
+    def test_find_and_delete(self):
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            with self.subTest(cls=cls.__name__):
+                linked_list = cls(indexed=True)
+                for value in [1, 2, 3, 2, 4]:
+                    linked_list.append(value)
+                linked_list.insert(0, 0)
+                self.assertIs(linked_list.find(2), linked_list.get_head().next.next)
+                linked_list.delete(2)
+                linked_list.delete(4)
+                linked_list.delete(99)
+                self.assertEqual(self.values(linked_list), [0, 1, 3, 2])
+                self.assertEqual(linked_list.get_tail().value, 2)
+                self.assertIsNone(linked_list.find(4))
+                self.assertEqual(linked_list.find(2).value, 2)
+
+    def test_delete_node(self):
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            for indexed in [False, True]:
+                with self.subTest(cls=cls.__name__, indexed=indexed):
+                    linked_list = cls(indexed=indexed)
+                    for value in range(5):
+                        linked_list.append(value)
+                    linked_list.delete_node(linked_list.find(4))
+                    linked_list.delete_node(linked_list.get_head())
+                    linked_list.delete_node(linked_list.find(2))
+                    self.assertEqual(self.values(linked_list), [1, 3])
+                    self.assertEqual(linked_list.get_tail().value, 3)
+
+    def test_delete_node_rejects_foreign_nodes(self):
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            for indexed in [False, True]:
+                with self.subTest(cls=cls.__name__, indexed=indexed):
+                    linked_list, other = cls(indexed=indexed), cls(indexed=indexed)
+                    for value in range(3):
+                        linked_list.append(value)
+                    other.append(1)
+                    removed = linked_list.find(1)
+                    linked_list.delete_node(removed)
+                    for node in [removed, other.get_head()]:
+                        with self.assertRaises(ValueError):
+                            linked_list.delete_node(node)
+                    self.assertEqual(self.values(linked_list), [0, 2])
+                    self.assertEqual(len(linked_list), 2)
+                    self.assertEqual(self.values(other), [1])
+                    self.assertEqual(len(other), 1)
+                    linked_list._check()
+                    other._check()
+
+    def test_indexed_singly_reverse(self):
+        linked_list = hw.SinglyLinkedList(indexed=True)
+        for value in range(4):
+            linked_list.append(value)
+        linked_list.reverse()
+        linked_list.delete(1)
+        self.assertEqual(self.values(linked_list), [3, 2, 0])
+
+    def test_index_follows_list_order(self):
+        def splice_front(linked_list):
+            other = type(linked_list)(indexed=linked_list.index is not None)
+            for value in [2, 1, 2]:
+                other.append(value)
+            linked_list.splice(None, other)
+
+        def splice_middle(linked_list):
+            other = type(linked_list)(indexed=linked_list.index is not None)
+            for value in [3, 2]:
+                other.append(value)
+            linked_list.splice(linked_list.get_head(), other)
+
+        steps = [
+            ("insert head", lambda linked_list: linked_list.insert(0, 2)),
+            ("insert middle", lambda linked_list: linked_list.insert(1, 2)),
+            ("reverse", lambda linked_list: linked_list.reverse()),
+            ("rotate", lambda linked_list: linked_list.rotate(2)),
+            ("splice front", splice_front),
+            ("splice middle", splice_middle),
+        ]
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            for name, step in steps:
+                with self.subTest(cls=cls.__name__, step=name):
+                    plain, indexed = cls(), cls(indexed=True)
+                    for linked_list in (plain, indexed):
+                        for value in [1, 2, 3, 1, 2]:
+                            linked_list.append(value)
+                        step(linked_list)
+                    indexed._check()
+                    for value in [1, 2]:
+                        position = self.values(plain).index(value)
+                        node = indexed.get_head()
+                        for _ in range(position):
+                            node = node.next
+                        self.assertIs(indexed.find(value), node)
+                        plain.delete(value)
+                        indexed.delete(value)
+                        self.assertEqual(self.values(indexed), self.values(plain))
+                    indexed._check()
+
+
 class TestDoublyLinkedList(unittest.TestCase):
 
     def setUp(self):
@@ -127,6 +360,310 @@ class TestDoublyLinkedList(unittest.TestCase):
         self.assertEqual(self.list.get_head().value, 2)
         self.assertEqual(self.list.get_tail().value, 1)
 
+class TestLinkedListIteration(unittest.TestCase):
+    def test_iteration(self):
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            with self.subTest(cls=cls.__name__):
+                linked_list = cls()
+                for value in range(4):
+                    linked_list.append(value)
+                self.assertEqual(list(linked_list), [0, 1, 2, 3])
+                self.assertEqual(list(reversed(linked_list)), [3, 2, 1, 0])
+                self.assertEqual(list(linked_list.values()), linked_list.to_list())
+                self.assertEqual(
+                    [node.value for node in linked_list.nodes()], [0, 1, 2, 3]
+                )
+                self.assertEqual(linked_list.get_head().value, 0)
+
+    def test_write_to(self):
+        singly = hw.SinglyLinkedList()
+        doubly = hw.DoublyLinkedList()
+        for value in range(3):
+            singly.append(value)
+            doubly.append(value)
+        stream = io.StringIO()
+        singly.write_to(stream, chunk_size=2)
+        doubly.write_to(stream)
+        hw.SinglyLinkedList().write_to(stream)
+        self.assertEqual(
+            stream.getvalue(), "0 -> 1 -> 2 -> None\n0 <-> 1 <-> 2 <-> None\nNone\n"
+        )
+
+    def test_print_list(self):
+        linked_list = hw.DoublyLinkedList()
+        linked_list.append(1)
+        stream = io.StringIO()
+        with contextlib.redirect_stdout(stream):
+            linked_list.print_list()
+        self.assertEqual(stream.getvalue(), "1 <-> None\n")
+
+
+class TestLinkedListRelinking(unittest.TestCase):
+    def build(self, cls, values, indexed=False):
+        linked_list = cls(indexed=indexed)
+        for value in values:
+            linked_list.append(value)
+        return linked_list
+
+    def test_concat_steals_nodes(self):
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            for indexed in [False, True]:
+                with self.subTest(cls=cls.__name__, indexed=indexed):
+                    first = self.build(cls, [1, 2], indexed)
+                    second = self.build(cls, [3, 4], indexed)
+                    moved = second.get_head()
+                    first.concat(second)
+                    self.assertEqual(list(first), [1, 2, 3, 4])
+                    self.assertIs(first.find(3), moved)
+                    self.assertTrue(second.is_empty())
+                    first._check()
+                    second._check()
+
+    def test_splice(self):
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            with self.subTest(cls=cls.__name__):
+                target = self.build(cls, [1, 5])
+                target.splice(target.get_head(), self.build(cls, [2, 3, 4]))
+                target.splice(None, self.build(cls, [0]))
+                self.assertEqual(list(target), [0, 1, 2, 3, 4, 5])
+                self.assertEqual(len(target), 6)
+                target._check()
+                with self.assertRaises(ValueError):
+                    target.splice(None, target)
+
+    def test_split_at(self):
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            with self.subTest(cls=cls.__name__):
+                linked_list = self.build(cls, range(6), indexed=True)
+                rest = linked_list.split_at(linked_list.find(2))
+                self.assertEqual(list(linked_list), [0, 1, 2])
+                self.assertEqual(list(rest), [3, 4, 5])
+                self.assertIsNone(linked_list.find(4))
+                self.assertEqual(rest.find(4).value, 4)
+                linked_list._check()
+                rest._check()
+
+    def test_rotate(self):
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            with self.subTest(cls=cls.__name__):
+                linked_list = self.build(cls, range(5))
+                linked_list.rotate(2)
+                self.assertEqual(list(linked_list), [3, 4, 0, 1, 2])
+                linked_list.rotate(-3)
+                self.assertEqual(list(linked_list), [1, 2, 3, 4, 0])
+                linked_list.rotate(10)
+                self.assertEqual(list(linked_list), [1, 2, 3, 4, 0])
+                linked_list._check()
+
+
+class TestLinkedListInvariants(unittest.TestCase):
+    def test_mutations_keep_invariants(self):
+        rng = random.Random(11)
+        for cls in [hw.SinglyLinkedList, hw.DoublyLinkedList]:
+            for indexed in [False, True]:
+                with self.subTest(cls=cls.__name__, indexed=indexed):
+                    linked_list = cls(indexed=indexed)
+                    for _ in range(500):
+                        value = rng.randint(0, 20)
+                        operation = rng.random()
+                        if operation < 0.4:
+                            linked_list.append(value)
+                        elif operation < 0.6:
+                            position = rng.randint(0, len(linked_list))
+                            linked_list.insert(position, value)
+                        elif operation < 0.9:
+                            linked_list.delete(value)
+                        else:
+                            linked_list.reverse()
+                        linked_list._check()
+                    self.assertEqual(len(linked_list), linked_list.size())
+
+    def test_check_detects_corruption(self):
+        linked_list = hw.DoublyLinkedList()
+        for value in range(3):
+            linked_list.append(value)
+        linked_list.get_tail().prev = None
+        with self.assertRaises(AssertionError):
+            linked_list._check()
+
+
+class TestArrayLinkedList(unittest.TestCase):
+    def test_append_insert_delete(self):
+        for typecode in [None, "q"]:
+            with self.subTest(typecode=typecode):
+                linked_list = hw.ArrayLinkedList(typecode=typecode)
+                for value in range(5):
+                    linked_list.append(value)
+                linked_list.insert(0, 10)
+                linked_list.insert(6, 11)
+                linked_list.delete(2)
+                linked_list.delete_slot(linked_list.find(4))
+                self.assertEqual(list(linked_list), [10, 0, 1, 3, 11])
+                self.assertEqual(linked_list.value_at(linked_list.get_tail()), 11)
+                self.assertEqual(linked_list.find(42), -1)
+                self.assertEqual(linked_list.size(), 5)
+
+    def test_reuses_freed_slots(self):
+        linked_list = hw.ArrayLinkedList(capacity=4)
+        slots = [linked_list.append(value) for value in range(4)]
+        linked_list.delete_slot(slots[1])
+        self.assertEqual(linked_list.append(9), slots[1])
+        self.assertEqual(len(linked_list.next), 4)
+        self.assertEqual(list(linked_list), [0, 2, 3, 9])
+
+    def test_values_and_to_list(self):
+        for typecode in [None, "q"]:
+            with self.subTest(typecode=typecode):
+                linked_list = hw.ArrayLinkedList(typecode=typecode)
+                for value in range(4):
+                    linked_list.append(value)
+                linked_list.insert(0, 9)
+                self.assertEqual(list(linked_list.values()), [9, 0, 1, 2, 3])
+                self.assertEqual(linked_list.to_list(), [9, 0, 1, 2, 3])
+                self.assertEqual(hw.ArrayLinkedList().to_list(), [])
+
+    def test_value_at_rejects_unused_slots(self):
+        linked_list = hw.ArrayLinkedList(capacity=4)
+        slots = [linked_list.append(value) for value in range(3)]
+        linked_list.delete_slot(slots[1])
+        self.assertEqual(linked_list.value_at(slots[0]), 0)
+        self.assertEqual(linked_list.value_at(slots[2]), 2)
+        for slot in [slots[1], 3, 4, -1]:
+            with self.assertRaises(IndexError):
+                linked_list.value_at(slot)
+        with self.assertRaises(IndexError):
+            linked_list.delete_slot(slots[1])
+        self.assertEqual(list(linked_list), [0, 2])
+
+    def test_nodes_have_no_dict(self):
+        for node in [hw.Node(1), hw.DoubleNode(1), hw.TreeNode(1)]:
+            with self.assertRaises(AttributeError):
+                node.extra = True
+
+
+class TestPositionalAccess(unittest.TestCase):
+    def test_doubly_linked_list_get_delete_at(self):
+        linked_list = hw.DoublyLinkedList()
+        for value in range(10):
+            linked_list.append(value)
+        linked_list.insert(8, 80)
+        self.assertEqual(linked_list.get(8), 80)
+        self.assertEqual(linked_list.get(9), 8)
+        self.assertEqual(linked_list.delete_at(1), 1)
+        self.assertEqual(linked_list.delete_at(9), 9)
+        self.assertEqual(linked_list.get_tail().value, 8)
+        with self.assertRaises(IndexError):
+            linked_list.get(9)
+
+    def test_singly_linked_list_insert_at_end(self):
+        linked_list = hw.SinglyLinkedList()
+        linked_list.insert(0, 1)
+        linked_list.insert(1, 2)
+        self.assertEqual(linked_list.get_tail().value, 2)
+        self.assertIs(linked_list.get_head().next, linked_list.get_tail())
+
+    def test_indexable_skip_list(self):
+        rng = random.Random(3)
+        skip_list = hw.IndexableSkipList(range(5))
+        expected = list(range(5))
+        for i in range(300):
+            position = rng.randint(0, len(expected))
+            skip_list.insert(position, i)
+            expected.insert(position, i)
+            if i % 3 == 0:
+                position = rng.randrange(len(expected))
+                self.assertEqual(skip_list.delete_at(position), expected.pop(position))
+        self.assertEqual(list(skip_list), expected)
+        self.assertEqual(skip_list.size(), len(expected))
+        self.assertEqual([skip_list.get(i) for i in range(len(expected))], expected)
+        self.assertEqual(skip_list.get_tail().value, expected[-1])
+        self.assertIs(skip_list.get_head().next.prev, skip_list.get_head())
+
+    def test_indexable_skip_list_find_delete(self):
+        skip_list = hw.IndexableSkipList([3, 1, 4, 1, 5])
+        self.assertEqual(skip_list.find(4).value, 4)
+        skip_list.delete(1)
+        self.assertEqual(list(skip_list), [3, 4, 1, 5])
+        self.assertIsNone(skip_list.find(9))
+        with self.assertRaises(IndexError):
+            skip_list.insert(6, 0)
+
+
+class TestLRUCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.evicted = []
+        self.cache = hw.LRUCache(
+            2,
+            clock=lambda: self.now,
+            on_evict=lambda key, value: self.evicted.append(key),
+        )
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.cache.put("c", 3)
+        self.assertNotIn("b", self.cache)
+        self.assertEqual(self.evicted, ["b"])
+        self.assertEqual((self.cache.hits, self.cache.evictions), (1, 1))
+
+    def test_peek_pop(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.assertEqual(self.cache.peek("a"), 1)
+        self.cache.put("c", 3)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.pop("b"), 2)
+        self.assertEqual(self.cache.pop("b", None), None)
+        with self.assertRaises(KeyError):
+            self.cache.pop("b")
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_ttl(self):
+        self.cache.put("a", 1, ttl=10)
+        self.now = 10
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.expirations, 1)
+        self.assertEqual(self.evicted, ["a"])
+
+    def test_max_bytes(self):
+        cache = hw.LRUCache(10, max_bytes=6, sizeof=len)
+        cache.put("a", "xxx")
+        cache.put("b", "yyy")
+        cache.put("c", "zz")
+        self.assertEqual(list(cache.map), ["b", "c"])
+        self.assertEqual(cache.nbytes, 5)
+        with self.assertRaises(ValueError):
+            cache.put("d", "1234567")
+
+
+class TestLFUCache(unittest.TestCase):
+    def test_evicts_least_frequently_used(self):
+        cache = hw.LFUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        cache.get("c")
+        cache.put("d", 4)
+        self.assertEqual(sorted(cache.map), ["a", "d"])
+
+    def test_ties_break_by_recency(self):
+        cache = hw.LFUCache(3)
+        for key in "abc":
+            cache.put(key, key)
+        for key in "bca":
+            cache.get(key)
+        cache.put("d", "d")
+        self.assertEqual(sorted(cache.map), ["a", "c", "d"])
+        self.assertEqual(cache.evictions, 1)
+
+
 class TestQueue(unittest.TestCase):
     def setUp(self):
         self.queue = hw.Queue()
@@ -145,6 +682,154 @@ class TestQueue(unittest.TestCase):
         self.queue.enqueue(1)
         self.assertFalse(self.queue.is_empty())
 
+    def test_wraparound_and_growth(self):
+        for i in range(5):
+            self.queue.enqueue(i)
+        for i in range(3):
+            self.assertEqual(self.queue.dequeue(), i)
+        for i in range(5, 20):
+            self.queue.enqueue(i)
+        self.assertEqual([self.queue.dequeue() for _ in range(17)], list(range(3, 20)))
+        self.assertTrue(self.queue.is_empty())
+        with self.assertRaises(IndexError):
+            self.queue.dequeue()
+
+    def test_enqueue_many_dequeue_many(self):
+        self.queue.enqueue_many(range(6))
+        self.assertEqual(self.queue.dequeue_many(4), [0, 1, 2, 3])
+        self.queue.enqueue_many(range(6, 12))
+        self.assertEqual(self.queue.dequeue_many(100), list(range(4, 12)))
+        self.assertEqual(len(self.queue), 0)
+
+    def test_shrink(self):
+        self.queue.enqueue_many(range(1000))
+        self.queue.dequeue_many(999)
+        self.assertEqual(self.queue.capacity, self.queue.min_capacity)
+        self.assertEqual(self.queue.peek(), 999)
+
+class TestConcurrentQueues(unittest.TestCase):
+
+    def test_thread_safe_queue_across_threads(self):
+        q = hw.ThreadSafeQueue(maxsize=4)
+        results = []
+
+        def consume():
+            for _ in range(500):
+                results.append(q.get(timeout=5))
+
+        consumers = [threading.Thread(target=consume) for _ in range(2)]
+        for thread in consumers:
+            thread.start()
+        for value in range(1000):
+            q.put(value, timeout=5)
+        for thread in consumers:
+            thread.join()
+        self.assertEqual(sorted(results), list(range(1000)))
+        self.assertTrue(q.is_empty())
+
+    def test_thread_safe_queue_timeouts(self):
+        q = hw.ThreadSafeQueue(maxsize=1)
+        with self.assertRaises(queue.Empty):
+            q.get(timeout=0.01)
+        q.put(1)
+        with self.assertRaises(queue.Full):
+            q.put(2, block=False)
+        self.assertEqual(q.get(block=False), 1)
+
+    def test_async_queue_put_get(self):
+        async def run():
+            q = hw.AsyncQueue(maxsize=2)
+            producer = asyncio.ensure_future(
+                asyncio.gather(*(q.put(value) for value in range(10))))
+            values = [await q.get() for _ in range(10)]
+            await producer
+            return values
+
+        self.assertEqual(sorted(asyncio.run(run())), list(range(10)))
+
+    def test_async_queue_get_batch(self):
+        async def run():
+            q = hw.AsyncQueue()
+            empty = await q.get_batch(5, max_wait=0.01)
+            for value in range(7):
+                await q.put(value)
+            first = await q.get_batch(5, max_wait=0.01)
+            rest = await q.get_batch(5)
+            return empty, first, rest, len(q.getters)
+
+        empty, first, rest, waiting = asyncio.run(run())
+        self.assertEqual(empty, [])
+        self.assertEqual(first, [0, 1, 2, 3, 4])
+        self.assertEqual(rest, [5, 6])
+        self.assertEqual(waiting, 0)
+
+
+class TestPriorityQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = hw.PriorityQueue()
+
+    def test_enqueue_dequeue_by_priority(self):
+        for value, priority in [("c", 3), ("a", 1), ("b", 2)]:
+            self.queue.enqueue(value, priority)
+        self.assertEqual(self.queue.peek(), "a")
+        self.assertEqual([self.queue.dequeue() for _ in range(3)], ["a", "b", "c"])
+        self.assertTrue(self.queue.is_empty())
+        with self.assertRaises(IndexError):
+            self.queue.dequeue()
+        with self.assertRaises(IndexError):
+            self.queue.peek()
+
+    def test_equal_priorities_are_fifo(self):
+        for value in range(10):
+            self.queue.enqueue(value, value % 2)
+        order = [self.queue.dequeue() for _ in range(10)]
+        self.assertEqual(order, [0, 2, 4, 6, 8, 1, 3, 5, 7, 9])
+
+    def test_heapify_and_enqueue_many(self):
+        values = random.Random(1).sample(range(1000), 200)
+        queue = hw.PriorityQueue(values)
+        queue.enqueue_many([5000, -1])
+        drained = [queue.dequeue() for _ in range(len(queue))]
+        self.assertEqual(drained, [-1] + sorted(values) + [5000])
+        queue.enqueue_many(["ccc", "a", "bb"], key=len)
+        self.assertEqual([queue.dequeue() for _ in range(3)], ["a", "bb", "ccc"])
+
+    def test_push_pop(self):
+        self.assertEqual(self.queue.push_pop(5), 5)
+        self.queue.enqueue_many([3, 7])
+        self.assertEqual(self.queue.push_pop(1), 1)
+        self.assertEqual(self.queue.push_pop(4), 3)
+        self.assertEqual([self.queue.dequeue() for _ in range(2)], [4, 7])
+
+    def test_handles(self):
+        handles = {value: self.queue.enqueue(value, 10 * value) for value in range(5)}
+        self.queue.decrease_key(handles[4], 5)
+        self.queue.update(handles[0], 100)
+        self.assertEqual(self.queue.remove(handles[2]), 2)
+        with self.assertRaises(ValueError):
+            self.queue.decrease_key(handles[1], 50)
+        with self.assertRaises(ValueError):
+            self.queue.remove(handles[2])
+        self.assertEqual(len(self.queue), 4)
+        self.assertEqual([self.queue.dequeue() for _ in range(4)], [4, 1, 3, 0])
+
+    def test_handles_from_another_queue(self):
+        other = hw.PriorityQueue()
+        handle = other.enqueue("a", 5)
+        self.queue.enqueue("b", 1)
+        with self.assertRaises(ValueError):
+            self.queue.remove(handle)
+        with self.assertRaises(ValueError):
+            self.queue.update(handle, 0)
+        with self.assertRaises(ValueError):
+            self.queue.decrease_key(handle, 0)
+        self.assertEqual(len(self.queue), 1)
+        self.assertEqual(len(other), 1)
+        self.assertEqual(self.queue.dequeue(), "b")
+        self.assertEqual(other.dequeue(), "a")
+
+
 class TestBinarySearchTree(unittest.TestCase):
     def setUp(self):
         self.bst = hw.BinarySearchTree()
@@ -185,6 +870,23 @@ class TestBinarySearchTree(unittest.TestCase):
             self.bst.insert(value)
         self.assertEqual(self.bst.level_order_traversal(), [5, 3, 7, 2, 4, 6, 8])
 
+    def test_iter_traversals_are_lazy(self):
+        values = [5, 3, 7, 2, 4, 6, 8]
+        for value in values:
+            self.bst.insert(value)
+        inorder = self.bst.iter_inorder()
+        self.assertEqual(next(inorder), 2)
+        self.assertEqual(list(inorder), [3, 4, 5, 6, 7, 8])
+        self.assertEqual(list(self.bst.iter_level_order()), [5, 3, 7, 2, 4, 6, 8])
+        self.assertEqual(list(hw.BinarySearchTree().iter_postorder()), [])
+
+    def test_traversals_on_deep_chain(self):
+        for value in range(1500, 0, -1):
+            self.bst.insert(value)
+        self.assertEqual(self.bst.inorder_traversal(), list(range(1, 1501)))
+        self.assertEqual(self.bst.preorder_traversal(), list(range(1500, 0, -1)))
+        self.assertEqual(self.bst.postorder_traversal(), list(range(1, 1501)))
+
     def test_minimum_maximum(self):
         values = [5, 3, 7, 2, 4, 6, 8]
         for value in values:
@@ -192,6 +894,28 @@ class TestBinarySearchTree(unittest.TestCase):
         self.assertEqual(self.bst.minimum().value, min(values))
         self.assertEqual(self.bst.maximum().value, max(values))
 
+    def test_range(self):
+        for value in range(0, 100, 10):
+            self.bst.insert(value)
+        self.assertEqual(list(self.bst.range(15, 50)), [20, 30, 40])
+        self.assertEqual(list(self.bst.range(0, 11)), [0, 10])
+        self.assertEqual(list(self.bst.range(95, 200)), [])
+
+    def test_floor_ceiling_successor_predecessor(self):
+        values = [5, 3, 7, 2, 4, 6, 8]
+        for value in values:
+            self.bst.insert(value)
+        self.assertEqual(self.bst.floor(5).value, 5)
+        self.assertEqual(self.bst.floor(100).value, 8)
+        self.assertIsNone(self.bst.floor(1))
+        self.assertEqual(self.bst.ceiling(0).value, 2)
+        self.assertIsNone(self.bst.ceiling(9))
+        self.assertEqual(self.bst.successor(5).value, 6)
+        self.assertIsNone(self.bst.successor(8))
+        self.assertEqual(self.bst.predecessor(5).value, 4)
+        self.assertIsNone(self.bst.predecessor(2))
+        self.assertIsNone(hw.BinarySearchTree().minimum())
+
     def test_size(self):
         values = [5, 3, 7, 2, 4, 6, 8]
         for value in values:
@@ -215,6 +939,95 @@ class TestBinarySearchTree(unittest.TestCase):
             self.bst.insert(value)
         self.assertTrue(self.bst.is_valid_bst())
 
+    def test_size_tracks_deletes(self):
+        values = [5, 3, 7, 2, 4, 6, 8]
+        for value in values:
+            self.bst.insert(value)
+        self.bst.delete(5)
+        self.bst.delete(42)
+        self.assertEqual(self.bst.size(), 6)
+        self.assertEqual(self.bst.root.size, 6)
+
+    def test_select_rank(self):
+        values = [5, 3, 7, 2, 4, 6, 8]
+        for value in values:
+            self.bst.insert(value)
+        ordered = sorted(values)
+        for k, value in enumerate(ordered):
+            self.assertEqual(self.bst.select(k).value, value)
+            self.assertEqual(self.bst.rank(value), k)
+        self.assertEqual(self.bst.rank(100), len(values))
+        with self.assertRaises(IndexError):
+            self.bst.select(len(values))
+
+class TestBulkLoadBinarySearchTree(unittest.TestCase):
+    def test_from_sorted(self):
+        bst = hw.BinarySearchTree.from_sorted(range(15))
+        self.assertEqual(bst.height(), 4)
+        self.assertEqual(bst.size(), 15)
+        self.assertEqual(bst.inorder_traversal(), list(range(15)))
+        self.assertTrue(bst.is_valid_bst())
+        with self.assertRaises(ValueError):
+            hw.BinarySearchTree.from_sorted([2, 1])
+
+    def test_from_iterable(self):
+        bst = hw.BinarySearchTree.from_iterable([5, 1, 4, 1, 3], balanced="avl")
+        self.assertEqual(bst.inorder_traversal(), [1, 1, 3, 4, 5])
+        self.assertTrue(bst.is_valid_bst())
+
+    def test_bulk_insert(self):
+        bst = hw.BinarySearchTree.from_sorted(range(0, 200, 2))
+        bst.bulk_insert([7])
+        bst.bulk_insert(range(1, 200, 2))
+        self.assertEqual(bst.size(), 201)
+        self.assertEqual(bst.inorder_traversal(), sorted(list(range(200)) + [7]))
+        self.assertTrue(bst.is_valid_bst())
+
+    def test_small_bulk_insert_stays_shallow(self):
+        bst = hw.BinarySearchTree.from_sorted(range(0, 4000, 40))
+        height = bst.height()
+        batch = range(1000, 1010)
+        bst.bulk_insert(batch)
+        self.assertLessEqual(bst.height(), height + len(batch).bit_length())
+        self.assertEqual(bst.size(), 110)
+        self.assertTrue(bst.is_valid_bst())
+
+
+class TestBalancedBinarySearchTree(unittest.TestCase):
+    def setUp(self):
+        self.bst = hw.BinarySearchTree(balanced="avl")
+
+    def test_sorted_inserts_stay_balanced(self):
+        for value in range(1023):
+            self.bst.insert(value)
+        self.assertEqual(self.bst.height(), 10)
+        self.assertTrue(self.bst.is_valid_bst())
+        self.assertEqual(self.bst.search(512).value, 512)
+
+    def test_delete_rebalances(self):
+        for value in range(100):
+            self.bst.insert(value)
+        for value in range(0, 100, 3):
+            self.bst.delete(value)
+        self.assertTrue(self.bst.is_valid_bst())
+        self.assertIsNone(self.bst.search(99))
+        self.assertEqual(
+            self.bst.inorder_traversal(), [v for v in range(100) if v % 3]
+        )
+
+    def test_unbalanced_tree_handles_deep_chains(self):
+        bst = hw.BinarySearchTree()
+        for value in range(1500):
+            bst.insert(value)
+        self.assertEqual(bst.height(), 1500)
+        self.assertEqual(bst.search(1499).value, 1499)
+        bst.delete(1499)
+        self.assertIsNone(bst.search(1499))
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            hw.BinarySearchTree(balanced="splay")
+
 class TestSortingAlgorithms(unittest.TestCase):
     def setUp(self):
         self.test_cases = [
@@ -255,5 +1068,266 @@ class TestSortingAlgorithms(unittest.TestCase):
             with self.subTest():
                 self.assertEqual(hw.quick_sort(input_list), expected_output)
 
+    def test_adaptive_sort(self):
+        for input_list, expected_output in self.test_cases:
+            with self.subTest():
+                self.assertEqual(hw.adaptive_sort(input_list), expected_output)
+
+    def test_adaptive_sort_runs(self):
+        rng = random.Random(3)
+        batches = []
+        for _ in range(12):
+            batch = sorted(rng.randint(0, 500) for _ in range(rng.randint(1, 400)))
+            batches += batch if rng.random() < 0.5 else batch[::-1]
+        nearly_sorted = list(range(3000))
+        for _ in range(20):
+            i, j = rng.randrange(3000), rng.randrange(3000)
+            nearly_sorted[i], nearly_sorted[j] = nearly_sorted[j], nearly_sorted[i]
+        records = [(value % 50, i) for i, value in enumerate(batches)]
+        first = lambda record: record[0]
+        for sort in [hw.adaptive_sort, hw.merge_sort]:
+            with self.subTest(sort=sort.__name__):
+                for data in [batches, nearly_sorted, list(range(1000, 0, -1))]:
+                    self.assertEqual(sort(data), sorted(data))
+                self.assertEqual(sort(records, key=first), sorted(records, key=first))
+
+    def test_key_reverse_in_place(self):
+        sorts = [
+            hw.insertion_sort,
+            hw.selection_sort,
+            hw.bubble_sort,
+            hw.shell_sort,
+            hw.merge_sort,
+            hw.quick_sort,
+            hw.adaptive_sort,
+        ]
+        words = ["pear", "Fig", "apple", "kiwi", "Banana"]
+        for sort in sorts:
+            with self.subTest(sort=sort.__name__):
+                self.assertEqual(
+                    sort(words, key=str.lower), sorted(words, key=str.lower)
+                )
+                self.assertEqual(sort([3, 1, 2], reverse=True), [3, 2, 1])
+                data = [3, 1, 2]
+                self.assertIs(sort(data, in_place=True), data)
+                self.assertEqual(data, [1, 2, 3])
+
+    def test_stable_sorts(self):
+        records = [(i % 3, i) for i in range(30)]
+        stable = [hw.insertion_sort, hw.bubble_sort, hw.merge_sort, hw.adaptive_sort]
+        for sort in stable:
+            with self.subTest(sort=sort.__name__):
+                first = lambda record: record[0]
+                self.assertEqual(sort(records, key=first), sorted(records, key=first))
+                self.assertEqual(
+                    sort(records, key=first, reverse=True),
+                    sorted(records, key=first, reverse=True),
+                )
+
+    def test_large_inputs(self):
+        rng = random.Random(7)
+        cases = [
+            [rng.randint(0, 10**6) for _ in range(5000)],
+            [rng.randint(0, 3) for _ in range(5000)],
+            list(range(5000)),
+            list(range(5000, 0, -1)),
+        ]
+        for sort in [hw.shell_sort, hw.merge_sort, hw.quick_sort, hw.adaptive_sort]:
+            for data in cases:
+                with self.subTest(sort=sort.__name__):
+                    self.assertEqual(sort(data), sorted(data))
+
+    def test_integer_sorts(self):
+        rng = random.Random(9)
+        cases = [
+            [rng.randint(-5, 5) for _ in range(500)],
+            [rng.randint(-10**6, 10**6) for _ in range(500)],
+            [rng.getrandbits(64) - (1 << 63) for _ in range(500)],
+            [rng.getrandbits(80) for _ in range(500)],
+        ]
+        for sort in [hw.radix_sort, hw.counting_sort, hw.auto_sort]:
+            for data in cases:
+                if sort is hw.counting_sort and max(data) - min(data) > 10**7:
+                    continue
+                with self.subTest(sort=sort.__name__, high=max(data)):
+                    self.assertEqual(sort(data), sorted(data))
+                    descending = sort(data, reverse=True)
+                    self.assertEqual(descending, sorted(data, reverse=True))
+                    records = [(value, i) for i, value in enumerate(data)]
+                    bucket = lambda record: record[0] // 1000
+                    self.assertEqual(
+                        sort(records, key=bucket), sorted(records, key=bucket)
+                    )
+                    typed = array("q", [value >> 20 for value in data])
+                    self.assertEqual(list(sort(typed)), sorted(typed))
+
+    def test_integer_sort_errors(self):
+        for sort in [hw.radix_sort, hw.counting_sort]:
+            with self.subTest(sort=sort.__name__):
+                with self.assertRaises(TypeError):
+                    sort([1.5, 2])
+                with self.assertRaises(TypeError):
+                    sort(["a", "b"], key=str.upper)
+        with self.assertRaises(ValueError):
+            hw.counting_sort([0, 1 << 40])
+        self.assertEqual(hw.auto_sort([2.5, 1, True]), [1, True, 2.5])
+        self.assertEqual(hw.auto_sort(["b", "a"]), ["a", "b"])
+
+    def test_typed_containers(self):
+        values = [5, -2, 9, 0, -2, 7]
+        for sort in [hw.shell_sort, hw.merge_sort, hw.quick_sort]:
+            with self.subTest(sort=sort.__name__):
+                typed = array("q", values)
+                result = sort(typed, reverse=True)
+                self.assertIsInstance(result, array)
+                self.assertEqual(result.tolist(), sorted(values, reverse=True))
+                self.assertEqual(typed.tolist(), values)
+                self.assertIs(sort(typed, in_place=True), typed)
+                self.assertEqual(typed.tolist(), sorted(values))
+
+                dynamic = hw.DynamicArray(typecode="d")
+                dynamic.extend(values)
+                self.assertEqual(list(sort(dynamic)), sorted(values))
+                self.assertIs(sort(dynamic, in_place=True), dynamic)
+                self.assertEqual(list(dynamic), sorted(values))
+                dynamic.append(1.5)
+
+    def test_other_sorts_return_lists_for_typed_containers(self):
+        values = [5, -2, 9, 0, -2, 7]
+        sorts = [
+            hw.insertion_sort,
+            hw.selection_sort,
+            hw.bubble_sort,
+            hw.adaptive_sort,
+            hw.counting_sort,
+            hw.radix_sort,
+        ]
+        for sort in sorts:
+            with self.subTest(sort=sort.__name__):
+                typed = array("q", values)
+                result = sort(typed, reverse=True)
+                self.assertIsInstance(result, list)
+                self.assertEqual(result, sorted(values, reverse=True))
+                self.assertEqual(typed.tolist(), values)
+
+    @unittest.skipIf(hw.np is None, "NumPy is not installed")
+    def test_numpy_arrays(self):
+        np = hw.np
+        values = np.array([3.5, -1.0, 2.0, 0.0, 2.0])
+        for sort in [hw.shell_sort, hw.merge_sort, hw.quick_sort]:
+            with self.subTest(sort=sort.__name__):
+                result = sort(values)
+                self.assertIsInstance(result, np.ndarray)
+                self.assertEqual(result.tolist(), sorted(values.tolist()))
+                self.assertEqual(
+                    sort(values, reverse=True).tolist(),
+                    sorted(values.tolist(), reverse=True),
+                )
+                copy = values.copy()
+                self.assertIs(sort(copy, in_place=True), copy)
+                self.assertEqual(copy.tolist(), sorted(values.tolist()))
+
+    @unittest.skipIf(hw.np is None, "NumPy is not installed")
+    def test_numpy_stable_sorts_match_lists(self):
+        # -0.0 == 0.0, so their order shows whether equal values stay stable.
+        values = [0.0, -0.0, 1.0, -0.0, 0.0, -1.0, 0.0]
+        for sort in [hw.merge_sort, hw.auto_sort]:
+            for reverse in [False, True]:
+                with self.subTest(sort=sort.__name__, reverse=reverse):
+                    result = sort(hw.np.array(values), reverse=reverse)
+                    self.assertEqual(
+                        [repr(value) for value in result.tolist()],
+                        [repr(value) for value in sort(values, reverse=reverse)],
+                    )
+
+    def test_parallel_sorts(self):
+        rng = random.Random(11)
+        cases = [
+            [rng.randint(-10**12, 10**12) for _ in range(3000)],
+            [rng.random() for _ in range(3000)],
+            [str(rng.randint(0, 500)) for _ in range(3000)],
+        ]
+        for sort in [hw.merge_sort, hw.quick_sort]:
+            for data in cases:
+                with self.subTest(sort=sort.__name__, kind=type(data[0]).__name__):
+                    result = sort(
+                        data, parallel=True, workers=3, parallel_threshold=100
+                    )
+                    self.assertEqual(result, sorted(data))
+        records = [(i % 7, i) for i in range(2000)]
+        first = lambda record: record[0]
+        result = hw.merge_sort(
+            records, key=first, parallel=True, workers=2, parallel_threshold=1
+        )
+        self.assertEqual(result, sorted(records, key=first))
+
+class TestExternalSort(unittest.TestCase):
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.input_path = os.path.join(workdir.name, "input.bin")
+        self.output_path = os.path.join(workdir.name, "output.bin")
+
+    def write(self, records):
+        with open(self.input_path, "wb") as target:
+            records.tofile(target)
+
+    def read(self, typecode):
+        records = array(typecode)
+        with open(self.output_path, "rb") as source:
+            records.frombytes(source.read())
+        return records.tolist()
+
+    def test_spills_and_merges_runs(self):
+        rng = random.Random(5)
+        values = [rng.randint(-10**12, 10**12) for _ in range(5000)]
+        self.write(array("q", values))
+        reported = []
+        stats = hw.external_sort(
+            self.input_path,
+            self.output_path,
+            memory_limit=64 * 300,
+            progress=lambda stats: reported.append(stats.items_written),
+        )
+        self.assertEqual(self.read("q"), sorted(values))
+        self.assertEqual(stats.runs, 17)
+        self.assertEqual(stats.items, 5000)
+        self.assertEqual(stats.items_written, 5000)
+        self.assertEqual(stats.bytes_read, 2 * 5000 * 8)
+        self.assertEqual(stats.bytes_written, 2 * 5000 * 8)
+        self.assertEqual(reported[-1], 5000)
+
+    def test_many_runs_merge_in_passes(self):
+        values = [float(v) for v in random.Random(6).sample(range(10**6), 1000)]
+        self.write(array("d", values))
+        stats = hw.external_sort(
+            self.input_path,
+            self.output_path,
+            memory_limit=64 * 4,
+            typecode="d",
+            reverse=True,
+        )
+        self.assertEqual(self.read("d"), sorted(values, reverse=True))
+        self.assertEqual(stats.runs, 250)
+        self.assertEqual(stats.merge_passes, 1)
+
+    def test_single_run_and_empty_input(self):
+        for values in ([3, 1, 2], []):
+            with self.subTest(values=values):
+                self.write(array("i", values))
+                stats = hw.external_sort(
+                    self.input_path, self.output_path, typecode="i"
+                )
+                self.assertEqual(self.read("i"), sorted(values))
+                self.assertEqual(stats.runs, 0)
+
+    def test_partial_record(self):
+        with open(self.input_path, "wb") as target:
+            target.write(b"12345")
+        with self.assertRaises(ValueError):
+            hw.external_sort(self.input_path, self.output_path)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file